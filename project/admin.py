@@ -1,15 +1,162 @@
-from bs4 import Comment
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection
+from django.utils.functional import cached_property
 
-from django.contrib import admin
-from .models import Profile, Task, Category, Tag, Comment, Attachment
+from .models import Profile, Task, Category, Tag, Comment, Attachment, Workspace
+from .bulk import bulk_update_tasks
 
-class TaskAdmin(admin.ModelAdmin):
-    list_display = ('title', 'status', 'priority', 'due_date', 'assigned_to')
-    list_filter = ('status', 'priority', 'category', 'tags')
 
-admin.site.register(Profile)
-admin.site.register(Task)
-admin.site.register(Category)
-admin.site.register(Tag)
-admin.site.register(Comment)
-admin.site.register(Attachment)
+def estimated_row_count(model):
+    """Returns the planner's row estimate for a table, or None where no statistics are available."""
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            elif connection.vendor == 'sqlite':
+                # Filled in by ANALYZE; the first number of a table's stat is its row count
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never runs COUNT(*) over a whole large table.
+
+    Unfiltered lists use the table statistics once they exceed count_limit; filtered lists
+    are counted only up to count_limit rows and set `truncated` when more match.
+    """
+
+    count_limit = 10000
+    truncated = False
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimate = estimated_row_count(self.object_list.model)
+            if estimate is not None and estimate > self.count_limit:
+                return estimate
+        count = self.object_list[:self.count_limit + 1].count()
+        if count > self.count_limit:
+            self.truncated = True
+            return self.count_limit
+        return count
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # The "N total" link would need an exact COUNT(*) of the unfiltered table
+    show_full_result_count = False
+    list_per_page = 50
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        changelist = getattr(response, 'context_data', {}).get('cl')
+        if changelist is not None and changelist.paginator.truncated:
+            # The response renders after this, so the warning shows on this page
+            self.message_user(
+                request,
+                f"More than {changelist.paginator.count_limit} {changelist.opts.verbose_name_plural} match; "
+                f"only the first {changelist.paginator.count_limit} can be paged through. Narrow the filters to see the rest.",
+                messages.WARNING,
+            )
+        return response
+
+
+def _bulk_action(description, **changes):
+    def action(modeladmin, request, queryset):
+        updated = bulk_update_tasks(queryset, **changes)
+        modeladmin.message_user(request, f"{updated} task(s) updated.")
+
+    action.__name__ = 'set_' + '_'.join(f"{field}_{value}".lower().replace(' ', '_') for field, value in changes.items())
+    action.short_description = description
+    return action
+
+
+class TaskAdmin(ScalableAdmin):
+    # Assignees come from the one-to-one summary row, so the list needs no per-row M2M query
+    list_display = ('title', 'status', 'priority', 'due_date', 'category', 'assignees', 'comment_count', 'attachment_count', 'last_activity_at')
+    list_select_related = ('category', 'summary')
+    # Only indexed columns; filtering on M2M tags would join and de-duplicate the whole table
+    list_filter = ('status', 'category', 'created_at')
+    search_fields = ('^title',)
+    autocomplete_fields = ('parent', 'assigned_to', 'category', 'tags')
+    readonly_fields = ('created_by', 'comment_count', 'attachment_count', 'last_activity_at')
+    actions = [
+        _bulk_action("Mark selected tasks as Pending", status='Pending'),
+        _bulk_action("Mark selected tasks as In Progress", status='In Progress'),
+        _bulk_action("Mark selected tasks as Completed", status='Completed'),
+        _bulk_action("Set priority of selected tasks to High", priority='High'),
+        _bulk_action("Set priority of selected tasks to Medium", priority='Medium'),
+        _bulk_action("Set priority of selected tasks to Low", priority='Low'),
+    ]
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        # Task.save() rejects existing tasks without assignees, so require one up front
+        if db_field.name == 'assigned_to':
+            kwargs['required'] = True
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+    @admin.display(description='Assigned to')
+    def assignees(self, obj):
+        summary = getattr(obj, 'summary', None)
+        return ', '.join(summary.assignee_list) if summary else ''
+
+
+class CommentAdmin(ScalableAdmin):
+    list_display = ('task', 'user', 'created_at')
+    list_select_related = ('task', 'user')
+    search_fields = ('^task__title',)
+    autocomplete_fields = ('task', 'user')
+
+
+class AttachmentAdmin(ScalableAdmin):
+    list_display = ('file', 'task', 'uploaded_by', 'uploaded_at')
+    list_select_related = ('task', 'uploaded_by')
+    search_fields = ('^task__title',)
+    autocomplete_fields = ('task', 'uploaded_by')
+
+
+class WorkspaceAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'created_at')
+    search_fields = ('^name',)
+    prepopulated_fields = {'slug': ('name',)}
+
+
+class ProfileAdmin(admin.ModelAdmin):
+    list_display = ('user', 'role', 'display_name', 'workspace')
+    list_select_related = ('user', 'workspace')
+    list_filter = ('role', 'workspace')
+    search_fields = ('^user__username',)
+    autocomplete_fields = ('user',)
+
+    def get_queryset(self, request):
+        # Staff move users between workspaces, so list every profile
+        return Profile.all_objects.all()
+
+
+class CategoryAdmin(admin.ModelAdmin):
+    search_fields = ('^name',)
+    ordering = ('name',)
+
+
+class TagAdmin(admin.ModelAdmin):
+    search_fields = ('^name',)
+    ordering = ('name',)
+
+
+admin.site.register(Workspace, WorkspaceAdmin)
+admin.site.register(Profile, ProfileAdmin)
+admin.site.register(Task, TaskAdmin)
+admin.site.register(Category, CategoryAdmin)
+admin.site.register(Tag, TagAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Attachment, AttachmentAdmin)
@@ -0,0 +1,150 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Task, DailyTaskThroughput, OpenTaskSnapshot
+
+# (upper bound in days, label); the last bucket has no upper bound
+AGING_BUCKETS = [
+    (7, '0-7 days'),
+    (30, '8-30 days'),
+    (90, '31-90 days'),
+    (None, '90+ days'),
+]
+
+
+def record_transition(workspace_id, old_status, new_status, created=False, day=None):
+    """Folds one task status transition into its workspace's throughput row for today."""
+    record_transitions(workspace_id, [old_status], new_status, created=1 if created else 0, day=day)
+
+
+def record_transitions(workspace_id, old_statuses, new_status, created=0, day=None):
+    """Folds a set of one workspace's tasks moving to new_status into today's throughput row with one update."""
+    changes = {}
+    if created:
+        changes['created_count'] = F('created_count') + created
+    if new_status == 'Completed':
+        completed = sum(1 for status in old_statuses if status != 'Completed')
+        if completed:
+            changes['completed_count'] = F('completed_count') + completed
+    else:
+        reopened = sum(1 for status in old_statuses if status == 'Completed')
+        if reopened:
+            changes['reopened_count'] = F('reopened_count') + reopened
+    if not changes:
+        return
+
+    day = day or timezone.localdate()
+    with transaction.atomic():
+        DailyTaskThroughput.all_objects.get_or_create(workspace_id=workspace_id, day=day)
+        DailyTaskThroughput.all_objects.filter(workspace_id=workspace_id, day=day).update(**changes)
+
+
+def _age_bucket(now):
+    whens = []
+    for limit, label in AGING_BUCKETS:
+        if limit is not None:
+            whens.append(When(created_at__gte=now - timedelta(days=limit), then=Value(label)))
+    return Case(*whens, default=Value(AGING_BUCKETS[-1][1]))
+
+
+def snapshot_open_tasks(day=None):
+    """Aggregates open tasks into aging and overdue counts per workspace and category or assignee."""
+    day = day or timezone.localdate()
+    now = timezone.now()
+    open_tasks = Task.all_objects.exclude(status='Completed').annotate(age_bucket=_age_bucket(now)).order_by()
+    overdue = Count('pk', filter=Q(due_date__lt=day))
+
+    rows = []
+    dimensions = (('category', 'category__name'), ('assignee', 'assigned_to__username'))
+    for dimension, field in dimensions:
+        grouped = open_tasks.values('workspace_id', field, 'age_bucket').annotate(
+            open_count=Count('pk'), overdue_count=overdue
+        )
+        for group in grouped:
+            rows.append(OpenTaskSnapshot(
+                workspace_id=group['workspace_id'],
+                day=day,
+                dimension=dimension,
+                key=group[field] or '',
+                age_bucket=group['age_bucket'],
+                open_count=group['open_count'],
+                overdue_count=group['overdue_count'],
+            ))
+
+    with transaction.atomic():
+        OpenTaskSnapshot.all_objects.filter(day=day).delete()
+        OpenTaskSnapshot.objects.bulk_create(rows)
+    return len(rows)
+
+
+def backfill_throughput():
+    """Rebuilds every workspace's throughput history from the tasks that exist today.
+
+    Completion dates are not stored on tasks, so a completed task counts as
+    completed on the day of its last recorded activity.
+    """
+    created = (
+        Task.all_objects.annotate(day=TruncDate('created_at')).order_by()
+        .values('workspace_id', 'day').annotate(total=Count('pk'))
+    )
+    completed = (
+        Task.all_objects.filter(status='Completed').annotate(day=TruncDate('last_activity_at')).order_by()
+        .values('workspace_id', 'day').annotate(total=Count('pk'))
+    )
+
+    rows = {}
+    for counter, groups in (('created_count', created), ('completed_count', completed)):
+        for group in groups:
+            key = (group['workspace_id'], group['day'])
+            row = rows.setdefault(key, DailyTaskThroughput(workspace_id=group['workspace_id'], day=group['day']))
+            setattr(row, counter, group['total'])
+
+    with transaction.atomic():
+        DailyTaskThroughput.all_objects.all().delete()
+        DailyTaskThroughput.objects.bulk_create(rows.values(), batch_size=500)
+    return len(rows)
+
+
+def throughput_series(start, end):
+    """Returns created/completed counts for every day in [start, end], zero-filled.
+
+    Like latest_snapshot(), covers the current workspace only (every workspace when unscoped).
+    """
+    stored = {
+        row['day']: row
+        for row in DailyTaskThroughput.objects.filter(day__range=(start, end))
+        .values('day', 'created_count', 'completed_count', 'reopened_count')
+    }
+    series = []
+    day = start
+    while day <= end:
+        row = stored.get(day, {})
+        series.append({
+            'day': day.isoformat(),
+            'created': row.get('created_count', 0),
+            'completed': row.get('completed_count', 0),
+            'reopened': row.get('reopened_count', 0),
+        })
+        day += timedelta(days=1)
+    return series
+
+
+def latest_snapshot(end=None):
+    """Returns the most recent open-task snapshot taken on or before `end`, grouped by dimension."""
+    snapshots = OpenTaskSnapshot.objects.filter(day__lte=end) if end else OpenTaskSnapshot.objects.all()
+    day = snapshots.order_by('-day').values_list('day', flat=True).first()
+    result = {'day': day.isoformat() if day else None, 'aging': {}, 'overdue': {'category': {}, 'assignee': {}}}
+    if day is None:
+        return result
+
+    for row in OpenTaskSnapshot.objects.filter(day=day).values('dimension', 'key', 'age_bucket', 'open_count', 'overdue_count'):
+        if row['dimension'] == 'category':
+            # Each open task has one category, so summing this dimension gives global aging without double counting
+            result['aging'][row['age_bucket']] = result['aging'].get(row['age_bucket'], 0) + row['open_count']
+        overdue = result['overdue'][row['dimension']]
+        overdue[row['key']] = overdue.get(row['key'], 0) + row['overdue_count']
+    return result
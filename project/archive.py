@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    Task, Comment, Attachment, TaskDependency,
+    ArchivedTask, ArchivedComment, ArchivedAttachment, ArchivedTaskDependency,
+)
+from .fragments import invalidate_fragments
+from .summaries import refresh_task_summary
+from .board import append_rank
+from .hierarchy import add_task_node
+
+TASK_FIELDS = [
+    'id', 'title', 'description', 'due_date', 'priority', 'status', 'category_id', 'created_at',
+    'created_by_id', 'comment_count', 'attachment_count', 'last_activity_at', 'parent_id', 'workspace_id',
+]
+COMMENT_FIELDS = ['id', 'task_id', 'user_id', 'content', 'created_at']
+ATTACHMENT_FIELDS = ['id', 'task_id', 'file', 'uploaded_at', 'uploaded_by_id']
+DEPENDENCY_FIELDS = ['task_id', 'blocked_by_id', 'created_at']
+
+
+def _through_columns(descriptor):
+    """Returns (through model, owner column, related column) of a forward M2M descriptor."""
+    field = descriptor.field
+    through = descriptor.through
+    owner = through._meta.get_field(field.m2m_field_name()).attname
+    related = through._meta.get_field(field.m2m_reverse_field_name()).attname
+    return through, owner, related
+
+
+def _copy_m2m(source, target, task_ids):
+    """Copies the M2M rows of the given tasks from one through table to another."""
+    source_through, source_owner, source_related = _through_columns(source)
+    target_through, target_owner, target_related = _through_columns(target)
+    rows = source_through.objects.filter(**{f'{source_owner}__in': task_ids}).values_list(source_owner, source_related)
+    target_through.objects.bulk_create([
+        target_through(**{target_owner: task_id, target_related: related_id}) for task_id, related_id in rows
+    ])
+
+
+def archive_completed_tasks(older_than_days=90, batch_size=200):
+    """Moves tasks completed and idle for longer than the cutoff into the archive tables.
+
+    Covers every workspace. Each batch is copied and deleted in its own transaction. Returns the number of archived tasks.
+    Tasks that still have subtasks are kept, since deleting them would cascade to the subtasks;
+    a parent becomes eligible once its completed subtasks have been archived by an earlier batch.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    archived = 0
+    while True:
+        with transaction.atomic():
+            task_ids = list(
+                Task.all_objects.filter(status='Completed', last_activity_at__lt=cutoff, subtasks__isnull=True)
+                .order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not task_ids:
+                break
+
+            now = timezone.now()
+            ArchivedTask.objects.bulk_create([
+                ArchivedTask(archived_at=now, **row)
+                for row in Task.all_objects.filter(pk__in=task_ids).values(*TASK_FIELDS)
+            ])
+            _copy_m2m(Task.tags, ArchivedTask.tags, task_ids)
+            _copy_m2m(Task.assigned_to, ArchivedTask.assigned_to, task_ids)
+            ArchivedComment.objects.bulk_create([
+                ArchivedComment(**row) for row in Comment.objects.filter(task_id__in=task_ids).values(*COMMENT_FIELDS)
+            ])
+            ArchivedAttachment.objects.bulk_create([
+                ArchivedAttachment(**row)
+                for row in Attachment.objects.filter(task_id__in=task_ids).values(*ATTACHMENT_FIELDS)
+            ])
+            # Links in either direction, so restoring either end can bring them back
+            ArchivedTaskDependency.objects.bulk_create(
+                [
+                    ArchivedTaskDependency(**row)
+                    for row in TaskDependency.objects.filter(
+                        Q(task_id__in=task_ids) | Q(blocked_by_id__in=task_ids)
+                    ).values(*DEPENDENCY_FIELDS)
+                ],
+                ignore_conflicts=True,
+            )
+            # Cascades to comments, attachment rows, M2M rows, summaries, closure rows and dependencies
+            Task.all_objects.filter(pk__in=task_ids).delete()
+        archived += len(task_ids)
+    invalidate_fragments('task_list')
+    return archived
+
+
+def restore_task(task_id):
+    """Moves one archived task and everything archived with it back into the hot tables."""
+    with transaction.atomic():
+        archived = ArchivedTask.objects.select_for_update().get(pk=task_id)
+        if archived.parent_id and not Task.objects.filter(pk=archived.parent_id).exists():
+            archived.parent_id = None
+        # bulk_create skips Task.save(), whose assignee check cannot run before the M2M rows exist
+        fields = {field: getattr(archived, field) for field in TASK_FIELDS}
+        # Restoring counts as activity; the archived timestamp would have the next run archive it again
+        fields['last_activity_at'] = timezone.now()
+        Task.objects.bulk_create([Task(rank=append_rank(archived.status), **fields)])
+        add_task_node(task_id, archived.parent_id)
+        _copy_m2m(ArchivedTask.tags, Task.tags, [task_id])
+        _copy_m2m(ArchivedTask.assigned_to, Task.assigned_to, [task_id])
+        Comment.objects.bulk_create([
+            Comment(**row) for row in archived.comments.values(*COMMENT_FIELDS)
+        ])
+        Attachment.objects.bulk_create([
+            Attachment(**row) for row in archived.attachments.values(*ATTACHMENT_FIELDS)
+        ])
+        archived.delete()
+        _restore_dependencies(task_id)
+        refresh_task_summary(task_id)
+    return task_id
+
+
+def _restore_dependencies(task_id):
+    """Recreates the archived links of a restored task whose other end is back in the hot tables.
+
+    Links to a task that is still archived stay in the archive; links to a deleted task are dropped.
+    """
+    links = ArchivedTaskDependency.objects.filter(Q(task_id=task_id) | Q(blocked_by_id=task_id))
+    rows = list(links.values('pk', *DEPENDENCY_FIELDS))
+    other_ids = {row['blocked_by_id'] if row['task_id'] == task_id else row['task_id'] for row in rows}
+    hot_ids = set(Task.all_objects.filter(pk__in=other_ids).values_list('pk', flat=True))
+    archived_ids = set(ArchivedTask.all_objects.filter(pk__in=other_ids).values_list('pk', flat=True))
+
+    done = []
+    for row in rows:
+        other_id = row['blocked_by_id'] if row['task_id'] == task_id else row['task_id']
+        if other_id in archived_ids:
+            continue
+        done.append(row['pk'])
+        if other_id in hot_ids:
+            try:
+                TaskDependency(**{field: row[field] for field in DEPENDENCY_FIELDS}).save()
+            except ValidationError:
+                # A link added while this task was archived now closes a loop; the newer link wins
+                pass
+    links.filter(pk__in=done).delete()
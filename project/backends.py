@@ -0,0 +1,11 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .identity import get_cached_user
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend that resolves the session's user from the cache instead of a query per request."""
+
+    def get_user(self, user_id):
+        user = get_cached_user(user_id)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,187 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Length
+
+from .models import Task
+
+# Rank keys are strings over this alphabet; digits and lowercase letters sort the same under any collation
+RANK_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+RANK_BASE = len(RANK_DIGITS)
+# Columns holding keys longer than this are shortened by the next rebalance_board_ranks run
+RANK_REBALANCE_LENGTH = 24
+RANK_MAX_LENGTH = Task._meta.get_field('rank').max_length
+COLUMN_PAGE_SIZE = 25
+
+
+def rank_between(low, high):
+    """Returns a key strictly between low and high; '' means no lower bound and None no upper bound."""
+    if high is not None and low >= high:
+        raise ValueError(f"Rank {low!r} is not below {high!r}.")
+    result = ''
+    position = 0
+    while True:
+        lo = RANK_DIGITS.index(low[position]) if position < len(low) else 0
+        hi = RANK_DIGITS.index(high[position]) if high is not None and position < len(high) else RANK_BASE
+        if hi - lo > 1:
+            return result + RANK_DIGITS[(lo + hi) // 2]
+        result += RANK_DIGITS[lo]
+        if hi - lo == 1:
+            # The prefix is now below high, so later digits are unbounded above
+            high = None
+        position += 1
+
+
+def evenly_spaced_ranks(count):
+    """Returns `count` increasing fixed-width keys spread across the key space."""
+    width = 1
+    while RANK_BASE ** width <= count:
+        width += 1
+    width += 1  # leave room between neighbours
+    space = RANK_BASE ** width
+    ranks = []
+    for index in range(1, count + 1):
+        value = index * space // (count + 1)
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, RANK_BASE)
+            digits.append(RANK_DIGITS[digit])
+        # A trailing minimum digit would leave no key between it and its prefix
+        ranks.append(''.join(reversed(digits)).rstrip(RANK_DIGITS[0]))
+    return ranks
+
+
+def last_rank(status):
+    """Returns the highest rank in a column, or '' for an empty column."""
+    return Task.objects.filter(status=status).order_by('-rank').values_list('rank', flat=True).first() or ''
+
+
+def rank_after(low):
+    """Returns the shortest key above low; appending grows keys by one digit per RANK_BASE - 1 cards."""
+    if not low:
+        return rank_between('', None)
+    for position, digit in enumerate(low):
+        if digit != RANK_DIGITS[-1]:
+            return low[:position] + RANK_DIGITS[RANK_DIGITS.index(digit) + 1]
+    return low + RANK_DIGITS[1]
+
+
+def rank_before(high):
+    """Returns the shortest key below high; moving cards to the top grows keys by one digit per RANK_BASE - 1 moves."""
+    for position, digit in enumerate(high):
+        index = RANK_DIGITS.index(digit)
+        if index > 1:
+            return high[:position] + RANK_DIGITS[index - 1]
+        if index == 1:
+            # The minimum digit cannot end a key, so step below it with a maximum digit after it
+            return high[:position] + RANK_DIGITS[0] + RANK_DIGITS[-1]
+    return rank_between('', high)
+
+
+def append_rank(status):
+    """Returns a key below the bottom card of a column, rebalancing it first if the key would not fit."""
+    rank = rank_after(last_rank(status))
+    if len(rank) > RANK_MAX_LENGTH:
+        rebalance_column(status)
+        rank = rank_after(last_rank(status))
+    return rank
+
+
+def append_ranks(status, count):
+    """Returns `count` increasing keys below the current bottom of a column, for placing many cards at once."""
+    suffixes = evenly_spaced_ranks(count)
+    # Every key sharing a prefix that sorts after the last card also sorts after it
+    prefix = rank_after(last_rank(status))
+    if len(prefix) + len(suffixes[-1]) > RANK_MAX_LENGTH:
+        rebalance_column(status)
+        prefix = rank_after(last_rank(status))
+    return [prefix + suffix for suffix in suffixes]
+
+
+def column_page(status, cursor=None, page_size=COLUMN_PAGE_SIZE):
+    """Returns one page of a column in rank order and the cursor of the next page (or None)."""
+    tasks = Task.objects.filter(status=status).only('id', 'title', 'priority', 'due_date', 'status', 'rank')
+    if cursor:
+        rank, _, pk = cursor.rpartition(':')
+        tasks = tasks.filter(Q(rank__gt=rank) | Q(rank=rank, pk__gt=int(pk)))
+    tasks = list(tasks.order_by('rank', 'pk')[:page_size + 1])
+    next_cursor = None
+    if len(tasks) > page_size:
+        tasks = tasks[:page_size]
+        next_cursor = f"{tasks[-1].rank}:{tasks[-1].pk}"
+    return tasks, next_cursor
+
+
+def _adjacent_rank(task, status, above, rank=None, pk=None):
+    """Returns the rank of the card next to (rank, pk) in a column, or of its bottom card when rank is None.
+
+    The moved task itself is skipped; returns None when there is no such card.
+    """
+    tasks = Task.objects.filter(status=status).exclude(pk=task.pk)
+    if above:
+        if rank is not None:
+            tasks = tasks.filter(Q(rank__lt=rank) | Q(rank=rank, pk__lt=pk))
+        tasks = tasks.order_by('-rank', '-pk')
+    else:
+        tasks = tasks.filter(Q(rank__gt=rank) | Q(rank=rank, pk__gt=pk)).order_by('rank', 'pk')
+    return tasks.values_list('rank', flat=True).first()
+
+
+def move_task(task, status, before_id=None, after_id=None):
+    """Places a task between two neighbouring cards of a column, writing only the moved task's row.
+
+    before_id is the card that should end up above the task, after_id the one below it; when only
+    one is given, the other neighbour is the card next to it. Raises ValueError when the neighbours
+    are stale or the column needs a rebalance before the task fits.
+    """
+    neighbours = dict(
+        Task.objects.filter(pk__in=[pk for pk in (before_id, after_id) if pk], status=status)
+        .values_list('pk', 'rank')
+    )
+    if (before_id and before_id not in neighbours) or (after_id and after_id not in neighbours):
+        raise ValueError("The neighbouring cards are no longer in this column.")
+    low = neighbours[before_id] if before_id else None
+    high = neighbours[after_id] if after_id else None
+    if before_id and not after_id:
+        high = _adjacent_rank(task, status, above=False, rank=low, pk=before_id)
+    elif after_id and not before_id:
+        low = _adjacent_rank(task, status, above=True, rank=high, pk=after_id)
+    elif not before_id:
+        low = _adjacent_rank(task, status, above=True)
+
+    # Cards sharing a rank (only possible before their first rebalance) are ordered by pk
+    if low is not None and high is not None and low < high:
+        task.rank = rank_between(low, high)
+    elif high is not None and low is None:
+        task.rank = rank_before(high)
+    else:
+        task.rank = rank_after(low or '')
+    if len(task.rank) > RANK_MAX_LENGTH:
+        # Rebalancing here would rewrite the whole column; rebalance_board_ranks is overdue
+        raise ValueError("This column is being reordered; try again in a moment.")
+
+    with transaction.atomic():
+        if task.status == status:
+            Task.objects.filter(pk=task.pk).update(rank=task.rank)
+        else:
+            # A status change goes through save() so summaries, events and rollups see it
+            task.status = status
+            task.save(update_fields=['status', 'rank', 'last_activity_at'])
+    return task.rank
+
+
+def rebalance_column(status, batch_size=500):
+    """Rewrites a column's ranks as short, evenly spaced keys, keeping the current order."""
+    pks = list(Task.objects.filter(status=status).order_by('rank', 'pk').values_list('pk', flat=True))
+    tasks = [Task(pk=pk, rank=rank) for pk, rank in zip(pks, evenly_spaced_ranks(len(pks)))]
+    with transaction.atomic():
+        Task.objects.bulk_update(tasks, ['rank'], batch_size=batch_size)
+    return len(tasks)
+
+
+def pending_rebalance():
+    """Returns the statuses whose columns hold keys longer than RANK_REBALANCE_LENGTH."""
+    return set(
+        Task.objects.annotate(rank_length=Length('rank'))
+        .filter(rank_length__gt=RANK_REBALANCE_LENGTH)
+        .order_by().values_list('status', flat=True).distinct()
+    )
@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Task, TaskSummary, TaskEvent
+from .analytics import record_transitions
+from .board import append_ranks
+from .calendar_feeds import invalidate_feeds
+from .events import record_events
+from .fragments import invalidate_fragments
+from .saved_views import sync_saved_views
+
+BULK_FIELDS = {'status': TaskEvent.STATUS, 'priority': TaskEvent.PRIORITY}
+
+
+def bulk_update_tasks(tasks, batch_size=1000, **changes):
+    """Sets status and/or priority on every task of a queryset with set-based writes.
+
+    Does the work of the per-task save signals in bulk: summaries, saved views, event log,
+    throughput rollup, board ranks, feeds and list fragments. Returns the number of tasks that changed.
+    """
+    unknown = set(changes) - set(BULK_FIELDS)
+    if unknown:
+        raise ValueError(f"Cannot bulk update {', '.join(sorted(unknown))}.")
+
+    # exclude() with several lookups keeps the rows that differ in any of them
+    pending = tasks.exclude(**changes).order_by('pk').values('pk', 'workspace_id', *BULK_FIELDS)
+    updated = 0
+    last_pk = 0
+    while True:
+        rows = list(pending.filter(pk__gt=last_pk)[:batch_size])
+        if not rows:
+            break
+        last_pk = rows[-1]['pk']
+        _update_batch(rows, changes)
+        updated += len(rows)
+
+    if updated:
+        invalidate_fragments('task_list')
+    return updated
+
+
+def _update_batch(rows, changes):
+    now = timezone.now()
+    task_ids = [row['pk'] for row in rows]
+    with transaction.atomic():
+        Task.objects.filter(pk__in=task_ids).update(last_activity_at=now, **changes)
+        TaskSummary.objects.filter(task_id__in=task_ids).update(last_activity_at=now, **changes)
+        sync_saved_views(TaskSummary.objects.filter(task_id__in=task_ids))
+
+        status = changes.get('status')
+        moved = [row for row in rows if status is not None and row['status'] != status]
+        if moved:
+            # Tasks changing column go to its bottom, keeping their relative order
+            Task.objects.bulk_update(
+                [Task(pk=row['pk'], rank=rank) for row, rank in zip(moved, append_ranks(status, len(moved)))],
+                ['rank'],
+            )
+            # Unscoped querysets (e.g. from a management command) can span workspaces
+            old_statuses = {}
+            for row in moved:
+                old_statuses.setdefault(row['workspace_id'], []).append(row['status'])
+            for workspace_id, statuses in old_statuses.items():
+                record_transitions(workspace_id, statuses, status)
+
+        record_events(
+            (row['pk'], BULK_FIELDS[field], row[field], value) for row in rows for field, value in changes.items()
+        )
+
+        invalidate_feeds(Task.assigned_to.through.objects.filter(task_id__in=task_ids).values_list('user_id', flat=True))
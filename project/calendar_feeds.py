@@ -0,0 +1,143 @@
+import hashlib
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Category, Profile, TaskSummary
+from .identity import get_cached_user, load_profile
+
+FEED_TIMEOUT = 60 * 60 * 24
+TOKEN_TIMEOUT = 60 * 60
+
+
+def _version_key(user_id):
+    return f"ics_version:{user_id}"
+
+
+def feed_version(user_id):
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        version = 1
+        cache.add(_version_key(user_id), version, timeout=None)
+    return version
+
+
+def invalidate_feeds(user_ids):
+    """Marks every feed (all-tasks and per-category) of the given users as stale and records when they changed."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    # Kept in the database so every worker sends the same Last-Modified, with or without a shared cache
+    Profile.all_objects.filter(user_id__in=user_ids).update(feeds_changed_at=timezone.now())
+    for user_id in user_ids:
+        try:
+            cache.incr(_version_key(user_id))
+        except ValueError:
+            cache.add(_version_key(user_id), 2, timeout=None)
+
+
+def resolve_token(token):
+    """Returns the User owning a feed token, or None; warm lookups need no query."""
+    key = f"ics_token:{token}"
+    user_id = cache.get(key)
+    if user_id is None:
+        user_id = Profile.objects.filter(calendar_token=token).values_list('user_id', flat=True).first()
+        if user_id is None:
+            return None
+        cache.set(key, user_id, TOKEN_TIMEOUT)
+
+    user = get_cached_user(user_id)
+    # The cached profile is invalidated on save, so a reset token stops working immediately
+    if user is None or not user.is_active or load_profile(user).calendar_token != token:
+        cache.delete(key)
+        return None
+    return user
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def _fold(line):
+    """Folds a content line to 75 octets as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        chunk = encoded[:limit]
+        # Never split inside a multi-byte character
+        while chunk and (encoded[len(chunk):len(chunk) + 1] or b'\x00')[0] & 0xC0 == 0x80:
+            chunk = chunk[:-1]
+        parts.append(chunk.decode())
+        encoded = encoded[len(chunk):]
+    return '\r\n '.join(parts)
+
+
+def _stamp(moment):
+    return moment.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def build_feed(user, category=None):
+    """Renders the user's assigned tasks (optionally one category) as an iCalendar document."""
+    tasks = TaskSummary.objects.filter(TaskSummary.assigned_filter(pk=user.pk))
+    name = f"Tasks for {user.username}"
+    if category is not None:
+        tasks = tasks.filter(workspace_id=category.workspace_id, category_name=category.name)
+        name = f"{name} - {category.name}"
+    tasks = tasks.only('task_id', 'title', 'description', 'due_date', 'priority', 'status', 'last_activity_at')
+
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Task Management//Due Dates//EN',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:{_escape(name)}',
+    ]
+    for task in tasks.order_by('due_date', 'task_id'):
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:task-{task.pk}@taskmanagement',
+            f'DTSTAMP:{_stamp(task.last_activity_at)}',
+            f"DTSTART;VALUE=DATE:{task.due_date.strftime('%Y%m%d')}",
+            f"DTEND;VALUE=DATE:{(task.due_date + timedelta(days=1)).strftime('%Y%m%d')}",
+            f'SUMMARY:{_escape(task.title)}',
+            f'DESCRIPTION:{_escape(f"{task.status}, {task.priority} priority. {task.description}".strip())}',
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+
+    body = '\r\n'.join(_fold(line) for line in lines) + '\r\n'
+    # Read fresh: invalidate_feeds() updates the row without touching the cached profile
+    changed_at = Profile.all_objects.filter(user=user).values_list('feeds_changed_at', flat=True).first()
+    return {
+        'body': body,
+        'etag': f'"{hashlib.md5(body.encode(), usedforsecurity=False).hexdigest()}"',
+        'last_modified': (changed_at or timezone.now()).replace(microsecond=0),
+    }
+
+
+def get_feed(user, category_id=None):
+    """Returns the cached feed, rebuilding it only after one of its tasks changed.
+
+    Feeds are cached only in a shared cache: a version bump in a per-process one would not reach
+    the other workers. Returns None for an unknown category.
+    """
+    key = f"ics:{user.pk}:{category_id or 'all'}:v{feed_version(user.pk)}" if settings.SHARED_CACHE else None
+    feed = cache.get(key) if key else None
+    if feed is None:
+        category = None
+        if category_id is not None:
+            # Feed requests carry no workspace, so limit categories to the owner's one explicitly
+            category = Category.all_objects.filter(
+                pk=category_id, workspace_id=load_profile(user).workspace_id
+            ).first()
+            if category is None:
+                return None
+        feed = build_feed(user, category)
+        if key:
+            cache.set(key, feed, FEED_TIMEOUT)
+    return feed
@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Task, Comment, Attachment, TaskSummary
+from .summaries import bump_activity
+from .fragments import invalidate_fragments
+
+
+def record_activity(task_id, comments=0, attachments=0):
+    """Atomically adjusts a task's cached counters and touches its last activity time."""
+    now = timezone.now()
+    with transaction.atomic():
+        Task.objects.filter(pk=task_id).update(
+            comment_count=F('comment_count') + comments,
+            attachment_count=F('attachment_count') + attachments,
+            last_activity_at=now,
+        )
+        bump_activity(task_id, comments=comments, attachments=attachments, at=now)
+
+
+def _count_subquery(model):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(task=OuterRef('pk'))
+            .order_by()
+            .values('task')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def reconcile_task_counters(batch_size=500, dry_run=False):
+    """Repairs counters that drifted from the real Comment/Attachment rows.
+
+    Returns the ids of the tasks whose counters were wrong.
+    """
+    drifted = (
+        Task.objects.annotate(
+            actual_comments=_count_subquery(Comment),
+            actual_attachments=_count_subquery(Attachment),
+            latest_comment=Subquery(
+                Comment.objects.filter(task=OuterRef('pk')).order_by().values('task')
+                .annotate(latest=Max('created_at')).values('latest')
+            ),
+            latest_attachment=Subquery(
+                Attachment.objects.filter(task=OuterRef('pk')).order_by().values('task')
+                .annotate(latest=Max('uploaded_at')).values('latest')
+            ),
+        )
+        .exclude(comment_count=F('actual_comments'), attachment_count=F('actual_attachments'))
+        .only('pk', 'comment_count', 'attachment_count', 'last_activity_at')
+        .order_by('pk')
+    )
+
+    repaired = []
+    batch = []
+    for task in drifted.iterator(chunk_size=batch_size):
+        repaired.append(task.pk)
+        task.comment_count = task.actual_comments
+        task.attachment_count = task.actual_attachments
+        latest = max(filter(None, (task.last_activity_at, task.latest_comment, task.latest_attachment)))
+        task.last_activity_at = latest
+        batch.append(task)
+        if len(batch) >= batch_size and not dry_run:
+            _write_counters(batch)
+            batch = []
+    if batch and not dry_run:
+        _write_counters(batch)
+    return repaired
+
+
+def _write_counters(tasks):
+    fields = ['comment_count', 'attachment_count', 'last_activity_at']
+    summaries = [
+        TaskSummary(task_id=task.pk, **{field: getattr(task, field) for field in fields})
+        for task in tasks
+    ]
+    with transaction.atomic():
+        Task.objects.bulk_update(tasks, fields)
+        TaskSummary.objects.bulk_update(summaries, fields)
+    invalidate_fragments('task_list')
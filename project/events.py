@@ -0,0 +1,89 @@
+from contextvars import ContextVar
+from datetime import timedelta
+from functools import partial
+from itertools import chain
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import TaskEvent, TaskEventArchive
+
+# Set per request by EventActorMiddleware so signal handlers know who made a change
+current_actor = ContextVar('current_actor', default=None)
+
+
+def _build_event(task_id, field, old, new):
+    old, new = TaskEvent.encode(field, old), TaskEvent.encode(field, new)
+    if old == new:
+        return None
+    return TaskEvent(
+        task_id=task_id,
+        actor_id=current_actor.get(),
+        field=field,
+        old_value=old,
+        new_value=new,
+        created_at=timezone.now(),
+    )
+
+
+def record_events(changes):
+    """Queues events for (task_id, field, old, new) changes, written with one bulk insert on commit.
+
+    The callback belongs to the innermost savepoint, so events of a rolled-back savepoint are dropped
+    with it. Outside a transaction the events are written immediately.
+    """
+    events = [event for event in (_build_event(*change) for change in changes) if event is not None]
+    if events:
+        transaction.on_commit(partial(TaskEvent.objects.bulk_create, events))
+
+
+def _label_users(events):
+    """Sets `actor_name`, and `user_name` on assignee events, loading every user involved in one query."""
+    assignee_fields = (TaskEvent.ASSIGNEE_ADDED, TaskEvent.ASSIGNEE_REMOVED)
+    user_ids = {event.actor_id for event in events} | {event.new_value for event in events if event.field in assignee_fields}
+    user_ids.discard(None)
+    names = dict(User.objects.filter(pk__in=user_ids).values_list('pk', 'username')) if user_ids else {}
+    for event in events:
+        event.actor_name = names.get(event.actor_id, '')
+        if event.field in assignee_fields:
+            event.user_name = names.get(event.new_value, f"#{event.new_value}")
+    return events
+
+
+def _history(query, include_archived, limit):
+    events = list(TaskEvent.objects.filter(query).order_by('-created_at')[:limit])
+    if include_archived:
+        archived = TaskEventArchive.objects.filter(query).order_by('-created_at')[:limit]
+        events = sorted(chain(events, archived), key=lambda event: event.created_at, reverse=True)[:limit]
+    return _label_users(events)
+
+
+def task_history(task_id, include_archived=False, limit=200):
+    """Returns the newest events of one task."""
+    return _history(Q(task_id=task_id), include_archived, limit)
+
+
+def user_history(user_id, include_archived=False, limit=200):
+    """Returns the newest events made by a user or assigning/unassigning them."""
+    query = Q(actor_id=user_id) | Q(
+        field__in=(TaskEvent.ASSIGNEE_ADDED, TaskEvent.ASSIGNEE_REMOVED), new_value=user_id
+    )
+    return _history(query, include_archived, limit)
+
+
+def archive_events(older_than_days=180, batch_size=1000):
+    """Moves events older than the cutoff into the archive table, one batch per transaction."""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    fields = ['id', 'task_id', 'actor_id', 'field', 'old_value', 'new_value', 'created_at']
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(TaskEvent.objects.filter(created_at__lt=cutoff).order_by('pk').values(*fields)[:batch_size])
+            if not batch:
+                break
+            TaskEventArchive.objects.bulk_create([TaskEventArchive(**row) for row in batch])
+            TaskEvent.objects.filter(pk__in=[row['id'] for row in batch]).delete()
+        moved += len(batch)
+    return moved
@@ -6,7 +6,9 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from datetime import date
 import mimetypes
-from .models import Profile, Task, Category, Tag, Comment, Attachment
+from .models import Profile, Task, Category, Tag, Comment, Attachment, TaskDependency
+from .hierarchy import would_create_cycle
+from .workspaces import workspace_users
 
 
 class CommentForm(forms.ModelForm):
@@ -37,10 +39,28 @@ class AttachmentForm(forms.ModelForm):
         return file
 
 
+class DependencyForm(forms.ModelForm):
+    blocked_by = forms.ModelChoiceField(
+        queryset=Task.objects.only('id', 'title'),
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Task ID'}),
+        label="Blocked by task #"
+    )
+
+    class Meta:
+        model = TaskDependency
+        fields = ['blocked_by']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Class-level querysets were built before any workspace was active
+        self.fields['blocked_by'].queryset = Task.objects.only('id', 'title')
+
+
 class TaskForm(forms.ModelForm):
     assigned_to = forms.ModelMultipleChoiceField(
         queryset=User.objects.all(),
-        required=False,
+        required=True,
+        error_messages={'required': "At least one user must be assigned to the task."},
         widget=forms.SelectMultiple(attrs={'class': 'form-control'}),
         label="Assign To"
     )
@@ -82,12 +102,24 @@ class TaskForm(forms.ModelForm):
         required=False  # Allow tasks to be created without a category
     )
 
+    # Set from the parent task's "Add subtask" link rather than picked from a list of every task
+    parent = forms.ModelChoiceField(
+        queryset=Task.objects.only('id', 'title'),
+        widget=forms.HiddenInput,
+        required=False
+    )
+
     class Meta:
         model = Task
-        fields = ['title', 'description', 'due_date', 'priority', 'status', 'assigned_to', 'category', 'tags']
+        fields = ['title', 'description', 'due_date', 'priority', 'status', 'assigned_to', 'category', 'tags', 'parent']
 
     def __init__(self, *args, **kwargs):
         super(TaskForm, self).__init__(*args, **kwargs)
+        # Class-level querysets were built before any workspace was active
+        self.fields['assigned_to'].queryset = workspace_users()
+        self.fields['tags'].queryset = Tag.objects.all()
+        self.fields['category'].queryset = Category.objects.all()
+        self.fields['parent'].queryset = Task.objects.only('id', 'title')
         for field_name, field in self.fields.items():
             if not isinstance(field.widget, forms.CheckboxSelectMultiple):
                 field.widget.attrs.update({'class': 'form-control'})
@@ -98,6 +130,12 @@ class TaskForm(forms.ModelForm):
             raise ValidationError("Due date cannot be in the past.")
         return due_date
 
+    def clean_parent(self):
+        parent = self.cleaned_data['parent']
+        if would_create_cycle(self.instance, parent):
+            raise ValidationError("A task cannot be a subtask of itself or of one of its subtasks.")
+        return parent
+
     def save(self, commit=True):
         task = super().save(commit=False)
         if commit:
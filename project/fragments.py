@@ -0,0 +1,91 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.template.loader import render_to_string
+from django.utils.cache import patch_vary_headers
+
+from .workspaces import current_workspace, workspace_key
+
+FRAGMENT_TIMEOUT = 60 * 10
+
+
+def normalize_filters(query, names):
+    """Returns {name: value or None} with surrounding and repeated whitespace removed."""
+    params = {}
+    for name in names:
+        value = ' '.join(query.get(name, '').split())
+        params[name] = value or None
+    return params
+
+
+def wants_fragment(request):
+    """True when the client asked for the result list only (fetch() sends the header, links use ?fragment=1)."""
+    return request.headers.get('X-Fragment') == 'results' or request.GET.get('fragment') == '1'
+
+
+def _version_key(list_name, workspace_id=None):
+    return f"fragment_version:{list_name}:w{workspace_id or 'all'}"
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        version = 1
+        cache.add(key, version, timeout=None)
+    return version
+
+
+def fragment_version(list_name):
+    """Combines the deployment-wide version of a list with the current workspace's one."""
+    version = f"{_get_version(_version_key(list_name))}"
+    workspace_id = current_workspace.get()
+    if workspace_id is not None:
+        version += f".{_get_version(_version_key(list_name, workspace_id))}"
+    return version
+
+
+def invalidate_fragments(list_name):
+    """Makes cached fragments of a list stale by moving to a new version.
+
+    Inside a request only the current workspace's fragments are affected; outside one, all of them.
+    """
+    key = _version_key(list_name, current_workspace.get())
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 2, timeout=None)
+
+
+def fragment_cache_key(list_name, user_id, params):
+    """Builds a key from the list's data version, the viewer and the non-empty filters in a fixed order."""
+    active = sorted((name, value) for name, value in params.items() if value)
+    digest = hashlib.md5(json.dumps(active).encode(), usedforsecurity=False).hexdigest()
+    return workspace_key(f"fragment:{list_name}:v{fragment_version(list_name)}:u{user_id}:{digest}")
+
+
+def render_fragment(request, list_name, template_name, params, build_context, cacheable=True):
+    """Renders (or reuses) a list fragment; build_context only runs on a cache miss.
+
+    Fragments that embed per-session data such as CSRF tokens must pass cacheable=False. Nothing is
+    cached without a shared cache, since a version bump in a per-process one never reaches other workers.
+    """
+    cacheable = cacheable and settings.SHARED_CACHE
+    key = fragment_cache_key(list_name, request.user.pk, params) if cacheable else None
+    html = cache.get(key) if key else None
+    if html is None:
+        html = render_to_string(template_name, build_context(), request=request)
+        if key:
+            cache.set(key, html, FRAGMENT_TIMEOUT)
+
+    etag = f'"{hashlib.md5(html.encode(), usedforsecurity=False).hexdigest()}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(html)
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('X-Fragment', 'Cookie'))
+    return response
@@ -0,0 +1,140 @@
+from django.db import connection, transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Task, TaskClosure, TaskDependency
+
+CLOSURE_TABLE = TaskClosure._meta.db_table
+DEPENDENCY_TABLE = TaskDependency._meta.db_table
+TASK_TABLE = Task._meta.db_table
+
+
+def add_task_node(task_id, parent_id=None):
+    """Adds the closure rows of a new task: itself at depth 0 plus one per ancestor of its parent."""
+    with transaction.atomic():
+        TaskClosure.objects.create(ancestor_id=task_id, descendant_id=task_id, depth=0)
+        if parent_id:
+            _attach_subtree(task_id, parent_id)
+
+
+def move_subtree(task_id, parent_id):
+    """Re-links a task and all of its subtasks below a new parent (or to the top level when None).
+
+    Costs two statements however large the subtree is; the rows written are old/new ancestors x subtree size.
+    """
+    with transaction.atomic():
+        subtree = TaskClosure.objects.filter(ancestor_id=task_id).values('descendant_id')
+        outside = TaskClosure.objects.filter(descendant_id=task_id, depth__gt=0).values('ancestor_id')
+        TaskClosure.objects.filter(descendant_id__in=subtree, ancestor_id__in=outside).delete()
+        if parent_id:
+            _attach_subtree(task_id, parent_id)
+
+
+def _attach_subtree(task_id, parent_id):
+    # Every ancestor of the parent (including the parent) gains every node of the subtree
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {CLOSURE_TABLE} (ancestor_id, descendant_id, depth) "
+            f"SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1 "
+            f"FROM {CLOSURE_TABLE} above, {CLOSURE_TABLE} below "
+            f"WHERE above.descendant_id = %s AND below.ancestor_id = %s",
+            [parent_id, task_id],
+        )
+
+
+def rebuild_closure(batch_size=1000):
+    """Recomputes the whole closure table from Task.parent; returns the number of rows written."""
+    parents = dict(Task.all_objects.values_list('pk', 'parent_id'))
+    rows = []
+    for task_id in parents:
+        ancestor_id, depth = task_id, 0
+        while ancestor_id is not None:
+            rows.append(TaskClosure(ancestor_id=ancestor_id, descendant_id=task_id, depth=depth))
+            ancestor_id, depth = parents.get(ancestor_id), depth + 1
+    with transaction.atomic():
+        TaskClosure.objects.all().delete()
+        TaskClosure.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def descendants(task, max_depth=None):
+    """Returns every subtask below a task, nearest levels first."""
+    links = Q(ancestor_links__ancestor=task, ancestor_links__depth__gt=0)
+    if max_depth is not None:
+        links &= Q(ancestor_links__depth__lte=max_depth)
+    return Task.objects.filter(links).order_by('ancestor_links__depth', 'pk')
+
+
+def ancestors(task):
+    """Returns the chain of parents of a task, from the top-level task down."""
+    return Task.objects.filter(
+        descendant_links__descendant=task, descendant_links__depth__gt=0
+    ).order_by('-descendant_links__depth')
+
+
+def completion(task):
+    """Returns roll-up progress over all of a task's subtasks, in one aggregate query.
+
+    A task without subtasks is 0% or 100% depending on its own status.
+    """
+    counts = descendants(task).order_by().aggregate(
+        total=Count('pk'), completed=Count('pk', filter=Q(status='Completed'))
+    )
+    if not counts['total']:
+        counts['percent'] = 100 if task.status == 'Completed' else 0
+    else:
+        counts['percent'] = round(100 * counts['completed'] / counts['total'])
+    return counts
+
+
+def with_completion(tasks):
+    """Annotates a Task queryset with subtask_total and subtask_completed, one query for the whole list."""
+    def count(**filters):
+        return Coalesce(Subquery(
+            TaskClosure.objects.filter(ancestor=OuterRef('pk'), depth__gt=0, **filters)
+            .order_by().values('ancestor').annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField(),
+        ), Value(0))
+
+    return tasks.annotate(subtask_total=count(), subtask_completed=count(descendant__status='Completed'))
+
+
+def _dependency_walk(start_column, next_column):
+    # Follows dependency edges from a task; UNION (not UNION ALL) stops at nodes already visited
+    return (
+        f"WITH RECURSIVE walk(id) AS ("
+        f"SELECT {next_column} FROM {DEPENDENCY_TABLE} WHERE {start_column} = %s "
+        f"UNION SELECT edge.{next_column} FROM {DEPENDENCY_TABLE} edge JOIN walk ON edge.{start_column} = walk.id"
+        f") "
+    )
+
+
+def blockers(task):
+    """Returns every task that blocks this one, directly or through other blocked tasks."""
+    sql = _dependency_walk('task_id', 'blocked_by_id') + (
+        f"SELECT {TASK_TABLE}.* FROM {TASK_TABLE} JOIN walk ON {TASK_TABLE}.id = walk.id ORDER BY {TASK_TABLE}.id"
+    )
+    return Task.objects.raw(sql, [task.pk])
+
+
+def blocked_tasks(task):
+    """Returns every task waiting on this one, directly or transitively."""
+    sql = _dependency_walk('blocked_by_id', 'task_id') + (
+        f"SELECT {TASK_TABLE}.* FROM {TASK_TABLE} JOIN walk ON {TASK_TABLE}.id = walk.id ORDER BY {TASK_TABLE}.id"
+    )
+    return Task.objects.raw(sql, [task.pk])
+
+
+def is_blocked_by(task_id, blocker_id):
+    """True when blocker_id is reachable from task_id along dependency edges."""
+    sql = _dependency_walk('task_id', 'blocked_by_id') + "SELECT 1 FROM walk WHERE id = %s LIMIT 1"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [task_id, blocker_id])
+        return cursor.fetchone() is not None
+
+
+def would_create_cycle(task, parent):
+    """True when making `parent` the parent of `task` would put the task below itself."""
+    if parent is None or task.pk is None:
+        return False
+    return parent.pk == task.pk or TaskClosure.objects.filter(ancestor=task, descendant=parent).exists()
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from .models import Profile
+
+IDENTITY_TIMEOUT = 60 * 15
+
+
+# A per-process cache would keep serving a user or profile changed through another worker
+def _use_cache():
+    return settings.SHARED_CACHE
+
+
+def _user_key(user_id):
+    return f"identity:user:{user_id}"
+
+
+def _profile_key(user_id):
+    return f"identity:profile:{user_id}"
+
+
+# Everything a request reads from the session user; the password hash never enters the cache
+USER_FIELDS = [field.attname for field in User._meta.concrete_fields if field.attname != 'password']
+
+
+def get_cached_user(user_id):
+    """Returns the User for a session, served from the shared cache after the first load.
+
+    The cache holds USER_FIELDS and the session auth hash (an HMAC keyed with SECRET_KEY) instead of
+    the password hash. A cached user's password is deferred: reading it queries the database, and
+    saving the user leaves it untouched.
+    """
+    if not _use_cache():
+        return User.objects.filter(pk=user_id).first()
+    key = _user_key(user_id)
+    cached = cache.get(key)
+    if cached is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is not None:
+            cache.set(key, {
+                'values': [getattr(user, name) for name in USER_FIELDS],
+                'session_hash': user.get_session_auth_hash(),
+            }, IDENTITY_TIMEOUT)
+        return user
+    user = User.from_db(None, USER_FIELDS, cached['values'])
+    # A password change saves the user, which drops this entry along with the old hash
+    session_hash = cached['session_hash']
+    user.get_session_auth_hash = lambda: session_hash
+    return user
+
+
+def load_profile(user):
+    """Returns the user's Profile without ever writing; an unsaved one if the row is missing."""
+    key = _profile_key(user.pk)
+    profile = cache.get(key) if _use_cache() else None
+    if profile is None:
+        # Identity lookups are never workspace-scoped; the workspace is derived from this profile
+        profile = Profile.all_objects.filter(user_id=user.pk).first()
+        if profile is None:
+            return Profile(user=user)
+        if _use_cache():
+            cache.set(key, profile, IDENTITY_TIMEOUT)
+    profile.user = user
+    return profile
+
+
+def get_profile(request):
+    """Request-scoped profile loader."""
+    if not hasattr(request, '_cached_profile'):
+        request._cached_profile = load_profile(request.user)
+    return request._cached_profile
+
+
+def invalidate_user(user_id):
+    cache.delete(_user_key(user_id))
+
+
+def invalidate_profile(user_id):
+    cache.delete(_profile_key(user_id))
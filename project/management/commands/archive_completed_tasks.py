@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from project.archive import archive_completed_tasks, restore_task
+
+
+class Command(BaseCommand):
+    help = "Moves tasks completed more than N days ago into the archive tables, or restores one with --restore."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help="Archive tasks idle for more than this many days.")
+        parser.add_argument('--batch-size', type=int, default=200, help="Tasks moved per transaction.")
+        parser.add_argument('--restore', type=int, metavar='TASK_ID', help="Move an archived task back instead.")
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            restore_task(options['restore'])
+            self.stdout.write(self.style.SUCCESS(f"Restored task {options['restore']}."))
+            return
+        archived = archive_completed_tasks(older_than_days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} completed tasks."))
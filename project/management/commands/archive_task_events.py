@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from project.events import archive_events
+
+
+class Command(BaseCommand):
+    help = "Moves old task events from the hot event log into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=180, help="Archive events older than this many days.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Events moved per transaction.")
+
+    def handle(self, *args, **options):
+        moved = archive_events(older_than_days=options['older_than'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} task events."))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from project.startup import STARTUP_BUDGET_MS, deferred_modules_loaded, profile_startup
+
+
+class Command(BaseCommand):
+    help = "Profiles the import time of every module loaded by django.setup() and writes a sorted report."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sort', choices=['cumulative', 'self'], default='cumulative',
+                            help="Order by time including submodules (cumulative) or the module body only (self).")
+        parser.add_argument('--limit', type=int, default=30, help="Number of modules to list; 0 lists all.")
+        parser.add_argument('--output', help="Write the report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        profile = profile_startup()
+        key = f"{options['sort']}_us"
+        imports = sorted(profile['imports'], key=lambda row: row[key], reverse=True)
+        if options['limit']:
+            imports = imports[:options['limit']]
+
+        lines = [
+            f"django.setup() took {profile['setup_ms']:.0f} ms with import tracing "
+            f"(budget {STARTUP_BUDGET_MS} ms untraced); {len(profile['modules'])} modules loaded.",
+            f"{'cumulative ms':>14} {'self ms':>9}  module",
+        ]
+        for row in imports:
+            lines.append(f"{row['cumulative_us'] / 1000:>14.1f} {row['self_us'] / 1000:>9.1f}  {row['module']}")
+
+        deferred = deferred_modules_loaded(profile['modules'])
+        if deferred:
+            lines.append(f"Loaded at startup but should be imported lazily: {', '.join(deferred)}")
+        report = '\n'.join(lines) + '\n'
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report)
+            self.stdout.write(self.style.SUCCESS(f"Wrote import profile to {options['output']}."))
+        else:
+            self.stdout.write(report, ending='')
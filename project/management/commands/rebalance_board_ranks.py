@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from project.board import rebalance_column, pending_rebalance
+from project.models import Task
+
+
+class Command(BaseCommand):
+    help = "Rewrites long board rank keys as short, evenly spaced ones (flagged columns only unless --all)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Rebalance every column, flagged or not.")
+
+    def handle(self, *args, **options):
+        if options['all']:
+            statuses = [status for status, label in Task.STATUS_CHOICES]
+        else:
+            statuses = sorted(pending_rebalance())
+        for status in statuses:
+            count = rebalance_column(status)
+            self.stdout.write(f"Rebalanced {count} cards in {status}.")
+        self.stdout.write(self.style.SUCCESS(f"Rebalanced {len(statuses)} columns."))
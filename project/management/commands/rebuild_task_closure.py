@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from project.hierarchy import rebuild_closure
+
+
+class Command(BaseCommand):
+    help = "Recomputes the subtask closure table from each task's parent."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows written per bulk insert.")
+
+    def handle(self, *args, **options):
+        written = rebuild_closure(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} closure rows."))
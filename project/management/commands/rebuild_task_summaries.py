@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from project.summaries import rebuild_task_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the denormalized task summary table used by the list and dashboard views."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows written per bulk insert.")
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_task_summaries(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} task summaries."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from project.counters import reconcile_task_counters
+
+
+class Command(BaseCommand):
+    help = "Repairs cached per-task comment/attachment counters that drifted from the real rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Tasks written per bulk update.")
+        parser.add_argument('--dry-run', action='store_true', help="Only report drifted tasks.")
+
+    def handle(self, *args, **options):
+        repaired = reconcile_task_counters(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = "Found" if options['dry_run'] else "Repaired"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(repaired)} tasks with drifted counters."))
@@ -0,0 +1,48 @@
+import os
+import re
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import get_template
+
+STATIC_TAG = re.compile(r"""{%\s*static\s+['"]([^'"]+)['"]\s*%}""")
+
+
+class Command(BaseCommand):
+    help = "Reports the static bytes a page template pulls in, uncompressed versus precompressed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('templates', nargs='*', default=['project/base.html'], help="Templates to inspect.")
+
+    def handle(self, *args, **options):
+        if not getattr(staticfiles_storage, 'hashed_files', None):
+            raise CommandError("No static manifest found; run collectstatic first.")
+
+        for template_name in options['templates']:
+            source = get_template(template_name).template.source
+            names = sorted(set(STATIC_TAG.findall(source)))
+            self.stdout.write(self.style.MIGRATE_HEADING(template_name))
+
+            totals = {'raw': 0, 'gz': 0, 'br': 0}
+            for name in names:
+                hashed = staticfiles_storage.stored_name(name)
+                sizes = self.sizes(hashed)
+                for key in totals:
+                    totals[key] += sizes[key]
+                self.stdout.write(f"  {hashed}: {sizes['raw']} B raw, {sizes['gz']} B gzip, {sizes['br']} B brotli")
+
+            self.stdout.write(
+                f"  Total before: {totals['raw']} B uncompressed. "
+                f"After: {totals['br']} B with brotli, {totals['gz']} B with gzip on first visit, "
+                f"0 B on repeat visits (immutable caching)."
+            )
+
+    def sizes(self, hashed):
+        path = staticfiles_storage.path(hashed)
+        raw = os.path.getsize(path)
+        sizes = {'raw': raw}
+        for key in ('gz', 'br'):
+            variant = f"{path}.{key}"
+            # Assets without a smaller variant are sent as-is
+            sizes[key] = os.path.getsize(variant) if os.path.exists(variant) else raw
+        return sizes
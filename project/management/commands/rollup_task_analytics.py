@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from project.analytics import backfill_throughput, snapshot_open_tasks
+
+
+class Command(BaseCommand):
+    help = "Writes today's open-task aging snapshot; with --backfill, rebuilds daily throughput history first."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backfill', action='store_true', help="Rebuild throughput rows from existing tasks.")
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            days = backfill_throughput()
+            self.stdout.write(f"Backfilled throughput for {days} days.")
+        rows = snapshot_open_tasks()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} open-task snapshot rows."))
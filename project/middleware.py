@@ -0,0 +1,113 @@
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+from .events import current_actor
+from .identity import get_profile
+from .models import Workspace
+from .workspaces import NO_WORKSPACE, current_workspace
+
+
+class EventActorMiddleware:
+    """Exposes the authenticated user to the task event log for the duration of a request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = getattr(request, 'user', None)
+        token = current_actor.set(user.pk if user is not None and user.is_authenticated else None)
+        try:
+            return self.get_response(request)
+        finally:
+            current_actor.reset(token)
+
+
+class WorkspaceMiddleware:
+    """Scopes every partitioned query of a request to the signed-in user's workspace."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = getattr(request, 'user', None)
+        workspace_id = None
+        if user is not None and user.is_authenticated:
+            # Users without a profile read the default workspace; a request never creates it, and
+            # while it is missing they are scoped to an id no row has rather than left unscoped
+            workspace_id = get_profile(request).workspace_id or Workspace.find_default_id() or NO_WORKSPACE
+        token = current_workspace.set(workspace_id)
+        try:
+            return self.get_response(request)
+        finally:
+            current_workspace.reset(token)
+
+
+class StaticAssetMiddleware:
+    """Serves collected static files with precompressed variants and long-lived cache headers.
+
+    Hashed names from the manifest never change content, so they are marked immutable for a year;
+    anything else gets a short max-age. Only active when DEBUG is off, where runserver does not serve static.
+    """
+
+    immutable_max_age = 60 * 60 * 24 * 365
+    default_max_age = 60
+    encodings = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = '/' + settings.STATIC_URL.lstrip('/')
+        self.root = str(settings.STATIC_ROOT) if getattr(settings, 'STATIC_ROOT', None) else None
+        self._hashed_names = None
+
+    def __call__(self, request):
+        if settings.DEBUG or not self.root or not request.path.startswith(self.prefix):
+            return self.get_response(request)
+        if request.method not in ('GET', 'HEAD'):
+            return self.get_response(request)
+
+        name = posixpath.normpath(request.path[len(self.prefix):]).lstrip('/')
+        path = os.path.join(self.root, name)
+        if name.startswith('..') or not os.path.isfile(path):
+            return self.get_response(request)
+        return self.serve(request, name, path)
+
+    @property
+    def hashed_names(self):
+        if self._hashed_names is None:
+            self._hashed_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        return self._hashed_names
+
+    def serve(self, request, name, path):
+        content_type, _ = mimetypes.guess_type(name)
+        accepted = request.headers.get('Accept-Encoding', '')
+        encoding = None
+        for candidate, suffix in self.encodings:
+            if candidate in accepted and os.path.isfile(path + suffix):
+                path, encoding = path + suffix, candidate
+                break
+
+        stat = os.stat(path)
+        etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(
+                open(path, 'rb'),
+                content_type=content_type or 'application/octet-stream',
+                filename=posixpath.basename(name),
+            )
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        response.headers['ETag'] = etag
+        if name in self.hashed_names:
+            response.headers['Cache-Control'] = f'public, max-age={self.immutable_max_age}, immutable'
+        else:
+            response.headers['Cache-Control'] = f'public, max-age={self.default_max_age}'
+        return response
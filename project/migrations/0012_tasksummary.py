@@ -0,0 +1,62 @@
+# Generated by Django 5.1.15 on 2026-10-19 19:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def populate_task_summaries(apps, schema_editor):
+    Task = apps.get_model('project', 'Task')
+    TaskSummary = apps.get_model('project', 'TaskSummary')
+
+    def pack(names):
+        names = sorted(names)
+        return f",{','.join(names)}," if names else ''
+
+    summaries = []
+    for task in Task.objects.select_related('category').prefetch_related('tags', 'assigned_to').iterator(chunk_size=500):
+        summaries.append(TaskSummary(
+            task_id=task.pk,
+            title=task.title,
+            description=task.description,
+            due_date=task.due_date,
+            priority=task.priority,
+            status=task.status,
+            category_name=task.category.name if task.category else '',
+            tag_names=pack(tag.name for tag in task.tags.all()),
+            assignee_usernames=pack(user.username for user in task.assigned_to.all()),
+            comment_count=task.comments.count(),
+            attachment_count=task.attachments.count(),
+        ))
+    TaskSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0011_profile_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskSummary',
+            fields=[
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='project.task')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('due_date', models.DateField()),
+                ('priority', models.CharField(choices=[('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')], default='Medium', max_length=10)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('In Progress', 'In Progress'), ('Completed', 'Completed')], default='Pending', max_length=15)),
+                ('category_name', models.CharField(blank=True, max_length=100)),
+                ('tag_names', models.TextField(blank=True)),
+                ('assignee_usernames', models.TextField(blank=True)),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('attachment_count', models.PositiveIntegerField(default=0)),
+                ('last_activity_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'priority'], name='project_tas_status_8f82b7_idx'), models.Index(fields=['due_date'], name='project_tas_due_dat_40ae3a_idx'), models.Index(fields=['category_name'], name='project_tas_categor_295fe2_idx')],
+            },
+        ),
+        migrations.RunPython(populate_task_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.15 on 2026-10-19 19:23
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_task_counters(apps, schema_editor):
+    Task = apps.get_model('project', 'Task')
+    TaskSummary = apps.get_model('project', 'TaskSummary')
+    for field, model in (('comment_count', 'Comment'), ('attachment_count', 'Attachment')):
+        counts = (
+            apps.get_model('project', model).objects.filter(task=OuterRef('pk'))
+            .order_by().values('task').annotate(total=Count('pk')).values('total')
+        )
+        Task.objects.update(**{field: Coalesce(Subquery(counts), 0)})
+        TaskSummary.objects.update(**{field: Subquery(Task.objects.filter(pk=OuterRef('task_id')).values(field))})
+
+    # Seed the activity time from the newest comment or attachment. Tasks have no earlier timestamp
+    # of their own (created_at only arrives in 0014), so those without either keep the migration time.
+    latest = {}
+    for model, field in (('Comment', 'created_at'), ('Attachment', 'uploaded_at')):
+        rows = (
+            apps.get_model('project', model).objects.order_by().values('task')
+            .annotate(latest=Max(field)).values_list('task', 'latest')
+        )
+        for task_id, at in rows:
+            latest[task_id] = max(latest.get(task_id, at), at)
+    Task.objects.bulk_update(
+        [Task(pk=task_id, last_activity_at=at) for task_id, at in latest.items()], ['last_activity_at'], batch_size=500
+    )
+    TaskSummary.objects.update(
+        last_activity_at=Subquery(Task.objects.filter(pk=OuterRef('task_id')).values('last_activity_at'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0012_tasksummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='attachment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(populate_task_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.15 on 2026-10-19 19:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0013_task_attachment_count_task_comment_count_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTaskThroughput',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('reopened_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.CreateModel(
+            name='OpenTaskSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(choices=[('category', 'Category'), ('assignee', 'Assignee')], max_length=10)),
+                ('key', models.CharField(blank=True, max_length=150)),
+                ('age_bucket', models.CharField(max_length=20)),
+                ('open_count', models.PositiveIntegerField(default=0)),
+                ('overdue_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'dimension', 'key', 'age_bucket'), name='unique_open_task_snapshot')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.15 on 2026-10-19 19:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0014_dailytaskthroughput_task_created_at_opentasksnapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.PositiveSmallIntegerField(choices=[(1, 'Status'), (2, 'Priority'), (3, 'Due date'), (4, 'Assignee added'), (5, 'Assignee removed')])),
+                ('old_value', models.IntegerField(blank=True, null=True)),
+                ('new_value', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='project.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task', 'created_at'], name='project_tas_task_id_854553_idx'), models.Index(fields=['actor', 'created_at'], name='project_tas_actor_i_7d4a2a_idx'), models.Index(fields=['field', 'new_value'], name='project_tas_field_6d8c30_idx'), models.Index(fields=['created_at'], name='project_tas_created_9acdfc_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskEventArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.PositiveSmallIntegerField(choices=[(1, 'Status'), (2, 'Priority'), (3, 'Due date'), (4, 'Assignee added'), (5, 'Assignee removed')])),
+                ('old_value', models.IntegerField(blank=True, null=True)),
+                ('new_value', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='project.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task', 'created_at'], name='project_tas_task_id_fa71ea_idx'), models.Index(fields=['actor', 'created_at'], name='project_tas_actor_i_9872a5_idx'), models.Index(fields=['field', 'new_value'], name='project_tas_field_746ab6_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+import secrets
+
+from django.db import migrations, models
+
+import project.models
+
+
+def fill_calendar_tokens(apps, schema_editor):
+    Profile = apps.get_model('project', 'Profile')
+    profiles = list(Profile.objects.only('pk'))
+    for profile in profiles:
+        profile.calendar_token = secrets.token_urlsafe(32)
+    Profile.objects.bulk_update(profiles, ['calendar_token'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0017_archivedattachment_archivedcomment_archivedtask_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='calendar_token',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(fill_calendar_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='profile',
+            name='calendar_token',
+            field=models.CharField(default=project.models.new_calendar_token, editable=False, max_length=64, unique=True),
+        ),
+    ]
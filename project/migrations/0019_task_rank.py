@@ -0,0 +1,56 @@
+# Generated by Django 5.1.15 on 2026-10-19 19:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+RANK_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+# Frozen copy of project.board.evenly_spaced_ranks, so later changes there cannot alter this migration
+def evenly_spaced_ranks(count):
+    base = len(RANK_DIGITS)
+    width = 1
+    while base ** width <= count:
+        width += 1
+    width += 1
+    space = base ** width
+    ranks = []
+    for index in range(1, count + 1):
+        value = index * space // (count + 1)
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, base)
+            digits.append(RANK_DIGITS[digit])
+        ranks.append(''.join(reversed(digits)).rstrip(RANK_DIGITS[0]))
+    return ranks
+
+
+def rank_existing_tasks(apps, schema_editor):
+    Task = apps.get_model('project', 'Task')
+    statuses = Task.objects.order_by().values_list('status', flat=True).distinct()
+    for status in list(statuses):
+        pks = list(Task.objects.filter(status=status).order_by('due_date', 'pk').values_list('pk', flat=True))
+        tasks = [Task(pk=pk, rank=rank) for pk, rank in zip(pks, evenly_spaced_ranks(len(pks)))]
+        Task.objects.bulk_update(tasks, ['rank'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0018_profile_calendar_token'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'rank', 'id'], name='project_tas_status_32ed68_idx'),
+        ),
+        migrations.RunPython(rank_existing_tasks, migrations.RunPython.noop),
+    ]
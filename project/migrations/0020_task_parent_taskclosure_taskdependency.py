@@ -0,0 +1,61 @@
+# Generated by Django 5.1.15 on 2026-10-19 19:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+# Existing tasks are all top-level, so each one only needs its depth-0 row
+def add_self_links(apps, schema_editor):
+    Task = apps.get_model('project', 'Task')
+    TaskClosure = apps.get_model('project', 'TaskClosure')
+    TaskClosure.objects.bulk_create(
+        [TaskClosure(ancestor_id=pk, descendant_id=pk, depth=0) for pk in Task.objects.values_list('pk', flat=True)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0019_task_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='parent_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='subtasks', to='project.task'),
+        ),
+        migrations.CreateModel(
+            name='TaskClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='project.task')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='project.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='project_tas_descend_3211f8_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_task_closure_pair')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('blocked_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependents', to='project.task')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependencies', to='project.task')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('task', 'blocked_by'), name='unique_task_dependency'), models.CheckConstraint(condition=models.Q(('task', models.F('blocked_by')), _negated=True), name='task_dependency_not_self')],
+            },
+        ),
+        migrations.RunPython(add_self_links, migrations.RunPython.noop),
+    ]
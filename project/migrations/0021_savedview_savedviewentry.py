@@ -0,0 +1,49 @@
+# Generated by Django 5.1.15 on 2026-10-19 19:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0020_task_parent_taskclosure_taskdependency'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedView',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('filters', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_opened_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_views', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SavedViewEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_view_entries', to='project.task')),
+                ('view', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='project.savedview')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='savedview',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_saved_view_name'),
+        ),
+        migrations.AddIndex(
+            model_name='savedviewentry',
+            index=models.Index(fields=['view', 'changed_at'], name='project_sav_view_id_b0e923_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='savedviewentry',
+            constraint=models.UniqueConstraint(fields=('view', 'task'), name='unique_saved_view_entry'),
+        ),
+    ]
@@ -0,0 +1,163 @@
+# Generated by Django 5.1.15 on 2026-10-19 19:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Everything that exists so far belongs to one team
+def assign_default_workspace(apps, schema_editor):
+    Workspace = apps.get_model('project', 'Workspace')
+    workspace, _ = Workspace.objects.get_or_create(slug='default', defaults={'name': 'Default'})
+    for name in ('Category', 'Tag', 'Task', 'Profile', 'TaskSummary', 'ArchivedTask', 'SavedView'):
+        apps.get_model('project', name).objects.update(workspace=workspace)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0021_savedview_savedviewentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Workspace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('slug', models.SlugField(unique=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='project_tas_status_32ed68_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='tasksummary',
+            name='project_tas_status_8f82b7_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='tasksummary',
+            name='project_tas_due_dat_40ae3a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='tasksummary',
+            name='project_tas_categor_295fe2_idx',
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='workspace',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archived_tasks', to='project.workspace'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='workspace',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='categories', to='project.workspace'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='workspace',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='profiles', to='project.workspace'),
+        ),
+        migrations.AddField(
+            model_name='savedview',
+            name='workspace',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='saved_views', to='project.workspace'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='workspace',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='tags', to='project.workspace'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='workspace',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='tasks', to='project.workspace'),
+        ),
+        migrations.AddField(
+            model_name='tasksummary',
+            name='workspace',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='project.workspace'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['workspace', 'archived_at'], name='project_arc_workspa_42a5da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['workspace', 'status', 'rank', 'id'], name='project_tas_workspa_9ee489_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasksummary',
+            index=models.Index(fields=['workspace', 'task'], name='project_tas_workspa_48fdac_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasksummary',
+            index=models.Index(fields=['workspace', 'status', 'priority'], name='project_tas_workspa_bdd14a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasksummary',
+            index=models.Index(fields=['workspace', 'due_date'], name='project_tas_workspa_35f580_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasksummary',
+            index=models.Index(fields=['workspace', 'category_name'], name='project_tas_workspa_496230_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(fields=('workspace', 'name'), name='unique_category_name_per_workspace'),
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('workspace', 'name'), name='unique_tag_name_per_workspace'),
+        ),
+        migrations.RunPython(assign_default_workspace, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='archivedtask',
+            name='workspace',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_tasks', to='project.workspace'),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='workspace',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='categories', to='project.workspace'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='workspace',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='profiles', to='project.workspace'),
+        ),
+        migrations.AlterField(
+            model_name='savedview',
+            name='workspace',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_views', to='project.workspace'),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='workspace',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='tags', to='project.workspace'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='workspace',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='tasks', to='project.workspace'),
+        ),
+        migrations.AlterField(
+            model_name='tasksummary',
+            name='workspace',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='project.workspace'),
+        ),
+    ]
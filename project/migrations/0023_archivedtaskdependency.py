@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-19 20:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0022_workspace'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTaskDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('blocked_by_id', models.BigIntegerField(db_index=True)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('task_id', 'blocked_by_id'), name='unique_archived_task_dependency')],
+            },
+        ),
+    ]
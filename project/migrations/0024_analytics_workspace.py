@@ -0,0 +1,58 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Rollups written so far cover the tasks that were moved into the default workspace
+def assign_default_workspace(apps, schema_editor):
+    Workspace = apps.get_model('project', 'Workspace')
+    workspace, _ = Workspace.objects.get_or_create(slug='default', defaults={'name': 'Default'})
+    for name in ('DailyTaskThroughput', 'OpenTaskSnapshot'):
+        apps.get_model('project', name).objects.update(workspace=workspace)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0023_archivedtaskdependency'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='opentasksnapshot',
+            name='unique_open_task_snapshot',
+        ),
+        migrations.AlterField(
+            model_name='dailytaskthroughput',
+            name='day',
+            field=models.DateField(),
+        ),
+        migrations.AddField(
+            model_name='dailytaskthroughput',
+            name='workspace',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='project.workspace'),
+        ),
+        migrations.AddField(
+            model_name='opentasksnapshot',
+            name='workspace',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='project.workspace'),
+        ),
+        migrations.RunPython(assign_default_workspace, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='dailytaskthroughput',
+            name='workspace',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='project.workspace'),
+        ),
+        migrations.AlterField(
+            model_name='opentasksnapshot',
+            name='workspace',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='project.workspace'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailytaskthroughput',
+            constraint=models.UniqueConstraint(fields=('workspace', 'day'), name='unique_daily_task_throughput'),
+        ),
+        migrations.AddConstraint(
+            model_name='opentasksnapshot',
+            constraint=models.UniqueConstraint(fields=('workspace', 'day', 'dimension', 'key', 'age_bucket'), name='unique_open_task_snapshot'),
+        ),
+    ]
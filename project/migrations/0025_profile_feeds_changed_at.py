@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-19 20:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0024_analytics_workspace'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='feeds_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
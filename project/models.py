@@ -3,16 +3,51 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from datetime import date
 import mimetypes
+import secrets
+
+from .workspaces import WorkspaceManager
 
 ROLE_CHOICES = [
     ('Manager', 'Manager'),
     ('Sub-Manager', 'Sub-Manager'),
     ('Officer', 'Officer'),
 ]
-# Category Model with unique name
-class Category(models.Model):
+# Workspace Model (one team's partition of tasks, categories, tags and profiles)
+class Workspace(models.Model):
+    DEFAULT_SLUG = 'default'
+
     name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(unique=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return self.name
+
+    # Workspace for rows created outside any request, e.g. new registrations and management commands
+    @classmethod
+    def default_id(cls):
+        return cls.objects.get_or_create(slug=cls.DEFAULT_SLUG, defaults={'name': 'Default'})[0].pk
+
+    # Read-only variant for requests; None when the default workspace does not exist
+    @classmethod
+    def find_default_id(cls):
+        return cls.objects.filter(slug=cls.DEFAULT_SLUG).values_list('pk', flat=True).first()
+
+
+# Category Model with a name unique per workspace
+class Category(models.Model):
+    workspace = models.ForeignKey(Workspace, related_name='categories', on_delete=models.PROTECT, editable=False)
+    name = models.CharField(max_length=100)
+
+    objects = WorkspaceManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['workspace', 'name'], name='unique_category_name_per_workspace'),
+        ]
 
     def __str__(self):
         return self.name
@@ -20,7 +55,16 @@ class Category(models.Model):
 
 # Tag Model
 class Tag(models.Model):
-    name = models.CharField(max_length=100, unique=True)
+    workspace = models.ForeignKey(Workspace, related_name='tags', on_delete=models.PROTECT, editable=False)
+    name = models.CharField(max_length=100)
+
+    objects = WorkspaceManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['workspace', 'name'], name='unique_tag_name_per_workspace'),
+        ]
 
     def __str__(self):
         return self.name
@@ -40,6 +84,7 @@ class Task(models.Model):
         ('High', 'High'),
     ]
 
+    workspace = models.ForeignKey(Workspace, related_name='tasks', on_delete=models.PROTECT, editable=False)
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     due_date = models.DateField()
@@ -48,6 +93,32 @@ class Task(models.Model):
     assigned_to = models.ManyToManyField(User, blank=True, related_name='tasks')
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
     tags = models.ManyToManyField(Tag, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='created_tasks')
+
+    # Cached counters, maintained with F() updates from the Comment/Attachment signals
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    attachment_count = models.PositiveIntegerField(default=0, editable=False)
+    last_activity_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    # Lexicographic position within the task's board column (see project/board.py)
+    rank = models.CharField(max_length=64, default='', blank=True, editable=False)
+
+    # Subtasks; the transitive tree is kept in TaskClosure (see project/hierarchy.py)
+    parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='subtasks')
+
+    COUNTER_FIELDS = ('comment_count', 'attachment_count')
+
+    objects = WorkspaceManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # Archival scans completed tasks of every workspace by how long they have been idle
+            models.Index(fields=['status', 'last_activity_at']),
+            # Board columns are read per workspace in rank order with cursor pagination
+            models.Index(fields=['workspace', 'status', 'rank', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.status}"
@@ -57,10 +128,24 @@ class Task(models.Model):
         if self.due_date < timezone.now().date():
             raise ValidationError("Due date cannot be in the past.")
 
-    # Ensure there's at least one user assigned to the task
+    # Ensure there's at least one user assigned to the task; a new task gets its assignees after
+    # the insert, so TaskForm validates them instead
     def save(self, *args, **kwargs):
-        if not self.assigned_to.exists():
+        if not self._state.adding and not self.assigned_to.exists():
             raise ValidationError("At least one user must be assigned to the task.")
+        # A task cannot be moved below itself or one of its own subtasks
+        if self.parent_id and not self._state.adding and (
+            self.parent_id == self.pk
+            or TaskClosure.objects.filter(ancestor_id=self.pk, descendant_id=self.parent_id).exists()
+        ):
+            raise ValidationError("A task cannot be a subtask of itself or of one of its subtasks.")
+        self.last_activity_at = timezone.now()
+        # Never write back counters from a possibly stale instance; only the F() updates own them
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
         super(Task, self).save(*args, **kwargs)
 
 
@@ -100,14 +185,396 @@ class Attachment(models.Model):
         super(Attachment, self).save(*args, **kwargs)
 
 
+# Task Closure Model (one row per ancestor/descendant pair, including each task with itself at depth 0)
+class TaskClosure(models.Model):
+    ancestor = models.ForeignKey(Task, related_name='descendant_links', on_delete=models.CASCADE)
+    descendant = models.ForeignKey(Task, related_name='ancestor_links', on_delete=models.CASCADE)
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='unique_task_closure_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['descendant', 'depth']),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
+
+# Task Dependency Model ("task" cannot start until "blocked_by" is done)
+class TaskDependency(models.Model):
+    task = models.ForeignKey(Task, related_name='dependencies', on_delete=models.CASCADE)
+    blocked_by = models.ForeignKey(Task, related_name='dependents', on_delete=models.CASCADE)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'blocked_by'], name='unique_task_dependency'),
+            models.CheckConstraint(condition=~models.Q(task=models.F('blocked_by')), name='task_dependency_not_self'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} blocked by {self.blocked_by_id}"
+
+    # Reject dependencies that would close a loop in the blocking graph
+    def clean(self):
+        from .hierarchy import is_blocked_by
+
+        if self.task_id == self.blocked_by_id:
+            raise ValidationError("A task cannot block itself.")
+        if is_blocked_by(self.blocked_by_id, self.task_id):
+            raise ValidationError("This dependency would create a cycle.")
+
+    def save(self, *args, **kwargs):
+        self.clean()
+        super(TaskDependency, self).save(*args, **kwargs)
+
+
+def new_calendar_token():
+    return secrets.token_urlsafe(32)
+
+
 # Profile Model
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
+    workspace = models.ForeignKey(Workspace, related_name='profiles', on_delete=models.PROTECT)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='Officer')
     display_name = models.CharField(max_length=100, blank=True, null=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
+    # Secret used in the user's calendar feed URLs; calendar clients cannot log in
+    calendar_token = models.CharField(max_length=64, unique=True, default=new_calendar_token, editable=False)
+    # Last change to any of the user's feeds, sent as Last-Modified; only invalidate_feeds() writes it
+    feeds_changed_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    objects = WorkspaceManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return f"{self.user.username} - {self.role}"
 
+    # Profiles are often saved from a cached copy, which must not move the feed timestamp back
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'feeds_changed_at'
+            ]
+        super().save(*args, **kwargs)
+
+
+# Task Summary Model (denormalized read model for list/dashboard rendering)
+class TaskSummary(models.Model):
+    task = models.OneToOneField(Task, primary_key=True, related_name='summary', on_delete=models.CASCADE)
+    workspace = models.ForeignKey(Workspace, related_name='+', on_delete=models.PROTECT)
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    due_date = models.DateField()
+    priority = models.CharField(max_length=10, choices=Task.PRIORITY_CHOICES, default='Medium')
+    status = models.CharField(max_length=15, choices=Task.STATUS_CHOICES, default='Pending')
+    category_name = models.CharField(max_length=100, blank=True)
+    # Names are stored delimited as ",a,b," so a single name can be matched with `contains` without a join
+    tag_names = models.TextField(blank=True)
+    assignee_usernames = models.TextField(blank=True)
+    comment_count = models.PositiveIntegerField(default=0)
+    attachment_count = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(default=timezone.now)
+
+    objects = WorkspaceManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        # List filters always run inside one workspace, so every index leads with it
+        indexes = [
+            models.Index(fields=['workspace', 'task']),
+            models.Index(fields=['workspace', 'status', 'priority']),
+            models.Index(fields=['workspace', 'due_date']),
+            models.Index(fields=['workspace', 'category_name']),
+        ]
+
+    def __str__(self):
+        return f"Summary of {self.title} - {self.status}"
+
+    @staticmethod
+    def pack_names(names):
+        names = sorted(names)
+        return f",{','.join(names)}," if names else ''
+
+    @staticmethod
+    def name_lookup(name):
+        return f",{name},"
+
+    @staticmethod
+    def assigned_filter(**user_filters):
+        """Q for summaries of tasks assigned to the users matching user_filters.
+
+        Goes through the assignment rows: `contains` on assignee_usernames ignores case on SQLite.
+        """
+        links = Task.assigned_to.through.objects.filter(
+            **{f"user__{lookup}": value for lookup, value in user_filters.items()}
+        )
+        return models.Q(task_id__in=links.values('task_id'))
+
+    @staticmethod
+    def tagged_filter(name):
+        """Q for summaries of tasks carrying the tag named exactly `name`, as assigned_filter()."""
+        links = Task.tags.through.objects.filter(tag__name=name)
+        return models.Q(task_id__in=links.values('task_id'))
+
+    @property
+    def tag_list(self):
+        return [name for name in self.tag_names.split(',') if name]
+
+    @property
+    def assignee_list(self):
+        return [name for name in self.assignee_usernames.split(',') if name]
+
+
+# Daily Throughput Rollup (one row per workspace and day, maintained from status transitions)
+class DailyTaskThroughput(models.Model):
+    workspace = models.ForeignKey(Workspace, related_name='+', on_delete=models.PROTECT)
+    day = models.DateField()
+    created_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+    reopened_count = models.PositiveIntegerField(default=0)
+
+    objects = WorkspaceManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['workspace', 'day'], name='unique_daily_task_throughput'),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: +{self.created_count} / done {self.completed_count}"
+
+
+# Open Task Snapshot (daily aging/overdue rollup per workspace and category or assignee)
+class OpenTaskSnapshot(models.Model):
+    DIMENSION_CHOICES = [
+        ('category', 'Category'),
+        ('assignee', 'Assignee'),
+    ]
+
+    workspace = models.ForeignKey(Workspace, related_name='+', on_delete=models.PROTECT)
+    day = models.DateField()
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=150, blank=True)
+    age_bucket = models.CharField(max_length=20)
+    open_count = models.PositiveIntegerField(default=0)
+    overdue_count = models.PositiveIntegerField(default=0)
+
+    objects = WorkspaceManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['workspace', 'day', 'dimension', 'key', 'age_bucket'], name='unique_open_task_snapshot'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.dimension}={self.key or '-'} {self.age_bucket}: {self.open_count}"
+
+
+# Task Event Log (append-only, integer-coded history of task field changes)
+class TaskEventBase(models.Model):
+    STATUS = 1
+    PRIORITY = 2
+    DUE_DATE = 3
+    ASSIGNEE_ADDED = 4
+    ASSIGNEE_REMOVED = 5
+
+    FIELD_CHOICES = [
+        (STATUS, 'Status'),
+        (PRIORITY, 'Priority'),
+        (DUE_DATE, 'Due date'),
+        (ASSIGNEE_ADDED, 'Assignee added'),
+        (ASSIGNEE_REMOVED, 'Assignee removed'),
+    ]
+
+    # Values are stored as small integers: 1-based positions in the choice lists, user ids and date ordinals
+    STATUS_CODES = {value: code for code, (value, label) in enumerate(Task.STATUS_CHOICES, start=1)}
+    PRIORITY_CODES = {value: code for code, (value, label) in enumerate(Task.PRIORITY_CHOICES, start=1)}
+
+    # No FK constraints, so history outlives deleted tasks and users and inserts stay cheap
+    task = models.ForeignKey(Task, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    actor = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+')
+    field = models.PositiveSmallIntegerField(choices=FIELD_CHOICES)
+    old_value = models.IntegerField(null=True, blank=True)
+    new_value = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"Task {self.task_id}: {self.get_field_display()} {self.old_value} -> {self.new_value}"
+
+    @classmethod
+    def encode(cls, field, value):
+        if value is None:
+            return None
+        if field == cls.STATUS:
+            return cls.STATUS_CODES[value]
+        if field == cls.PRIORITY:
+            return cls.PRIORITY_CODES[value]
+        if field == cls.DUE_DATE:
+            return value.toordinal()
+        return value
+
+    @classmethod
+    def decode(cls, field, code):
+        if code is None:
+            return None
+        if field == cls.STATUS:
+            return Task.STATUS_CHOICES[code - 1][0]
+        if field == cls.PRIORITY:
+            return Task.PRIORITY_CHOICES[code - 1][0]
+        if field == cls.DUE_DATE:
+            return date.fromordinal(code)
+        return code
+
+    @property
+    def old(self):
+        return self.decode(self.field, self.old_value)
+
+    @property
+    def new(self):
+        return self.decode(self.field, self.new_value)
+
+
+class TaskEvent(TaskEventBase):
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'created_at']),
+            models.Index(fields=['actor', 'created_at']),
+            models.Index(fields=['field', 'new_value']),
+            models.Index(fields=['created_at']),
+        ]
+
+
+# Task Event Archive (cold storage for old events, same schema as TaskEvent)
+class TaskEventArchive(TaskEventBase):
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'created_at']),
+            models.Index(fields=['actor', 'created_at']),
+            models.Index(fields=['field', 'new_value']),
+        ]
+
+
+# Archived Task Models (cold copies of long-completed tasks, keyed by their original ids)
+class ArchivedTask(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    workspace = models.ForeignKey(Workspace, related_name='archived_tasks', on_delete=models.PROTECT)
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    due_date = models.DateField()
+    priority = models.CharField(max_length=10, choices=Task.PRIORITY_CHOICES, default='Medium')
+    status = models.CharField(max_length=15, choices=Task.STATUS_CHOICES, default='Completed')
+    assigned_to = models.ManyToManyField(User, blank=True, related_name='archived_tasks')
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_tasks')
+    tags = models.ManyToManyField(Tag, blank=True, related_name='archived_tasks')
+    created_at = models.DateTimeField()
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_archived_tasks')
+    comment_count = models.PositiveIntegerField(default=0)
+    attachment_count = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField()
+    # Plain id: the parent may be archived later or deleted, and restore re-attaches only if it still exists
+    parent_id = models.BigIntegerField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    objects = WorkspaceManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['workspace', 'archived_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - archived"
+
+    @property
+    def category_name(self):
+        return self.category.name if self.category else ''
+
+    @property
+    def assignee_list(self):
+        return [user.username for user in self.assigned_to.all()]
+
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, related_name='comments', on_delete=models.CASCADE)
+    user = models.ForeignKey(User, related_name='archived_comments', on_delete=models.CASCADE)
+    content = models.TextField()
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Archived comment {self.pk} on task {self.task_id}"
+
+
+# Only the metadata moves; the stored file stays where it was uploaded
+class ArchivedAttachment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, related_name='attachments', on_delete=models.CASCADE)
+    file = models.CharField(max_length=100)
+    uploaded_at = models.DateTimeField()
+    uploaded_by = models.ForeignKey(User, related_name='archived_attachments', on_delete=models.CASCADE)
+
+    def __str__(self):
+        return f"Archived attachment {self.file} on task {self.task_id}"
+
+
+# "Blocked by" links with at least one archived end; plain ids because either end may be hot or archived
+class ArchivedTaskDependency(models.Model):
+    task_id = models.BigIntegerField()
+    blocked_by_id = models.BigIntegerField(db_index=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task_id', 'blocked_by_id'], name='unique_archived_task_dependency'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} blocked by {self.blocked_by_id} (archived)"
+
+
+# Saved View Models (named task_list filters with an incrementally maintained set of matching tasks)
+class SavedView(models.Model):
+    user = models.ForeignKey(User, related_name='saved_views', on_delete=models.CASCADE)
+    # Only tasks of this workspace can enter the view
+    workspace = models.ForeignKey(Workspace, related_name='saved_views', on_delete=models.CASCADE)
+    name = models.CharField(max_length=100)
+    filters = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_opened_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'name'], name='unique_saved_view_name'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.user.username})"
+
+
+class SavedViewEntry(models.Model):
+    view = models.ForeignKey(SavedView, related_name='entries', on_delete=models.CASCADE)
+    task = models.ForeignKey(Task, related_name='saved_view_entries', on_delete=models.CASCADE)
+    # Last time the task entered the view or changed while in it
+    changed_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['view', 'task'], name='unique_saved_view_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['view', 'changed_at']),
+        ]
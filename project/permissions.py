@@ -0,0 +1,74 @@
+from .models import Task
+from .identity import load_profile
+
+# Actions each role may take on a task, by relationship to it.
+# "any" covers every task, "own" tasks the user created, "assigned" tasks assigned to the user.
+ROLE_RULES = {
+    'Manager': {'edit': {'any'}, 'delete': {'any'}},
+    'Sub-Manager': {'edit': {'any'}, 'delete': {'own'}},
+    'Officer': {'edit': {'own', 'assigned'}, 'delete': {'own'}},
+}
+
+ACTIONS = ('edit', 'delete')
+
+
+class TaskPermissions:
+    """Resolves a user's task permissions in bulk and caches them for the request."""
+
+    def __init__(self, user):
+        self.user = user
+        self._role = None
+        self._cache = {}
+
+    @property
+    def role(self):
+        if self._role is None:
+            self._role = load_profile(self.user).role
+        return self._role
+
+    def load(self, task_ids):
+        """Resolves every action for the given tasks with at most three queries."""
+        missing = {task_id for task_id in task_ids if task_id not in self._cache}
+        if not missing:
+            return self
+        if not self.user.is_authenticated:
+            self._cache.update({task_id: dict.fromkeys(ACTIONS, False) for task_id in missing})
+            return self
+        if self.user.is_superuser or self.user.is_staff:
+            self._cache.update({task_id: dict.fromkeys(ACTIONS, True) for task_id in missing})
+            return self
+
+        rules = ROLE_RULES.get(self.role, ROLE_RULES['Officer'])
+        needs_relations = any(scopes - {'any'} for scopes in rules.values())
+        creators, assigned = {}, set()
+        if needs_relations:
+            creators = dict(Task.objects.filter(pk__in=missing).values_list('pk', 'created_by_id'))
+            assigned = set(
+                Task.assigned_to.through.objects.filter(task_id__in=missing, user_id=self.user.pk)
+                .values_list('task_id', flat=True)
+            )
+
+        for task_id in missing:
+            relations = {'any'}
+            if creators.get(task_id) == self.user.pk:
+                relations.add('own')
+            if task_id in assigned:
+                relations.add('assigned')
+            self._cache[task_id] = {action: bool(rules[action] & relations) for action in ACTIONS}
+        return self
+
+    def can(self, action, task_id):
+        return self.load([task_id])._cache[task_id][action]
+
+    def can_edit(self, task_id):
+        return self.can('edit', task_id)
+
+    def can_delete(self, task_id):
+        return self.can('delete', task_id)
+
+
+def get_task_permissions(request):
+    """Returns the request's TaskPermissions, creating it on first use."""
+    if not hasattr(request, '_task_permissions'):
+        request._task_permissions = TaskPermissions(request.user)
+    return request._task_permissions
@@ -0,0 +1,169 @@
+from functools import reduce
+from operator import or_
+
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import SavedView, SavedViewEntry, TaskSummary
+
+# task_list filters a view can store; archived results are not materialized
+SAVED_VIEW_FILTERS = ('status', 'priority', 'category', 'tag', 'due_date', 'assigned_to', 'search')
+SAVED_VIEW_PAGE_SIZE = 25
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def _fold_case(text):
+    """Lowers text the way the database's icontains does: SQLite's LIKE only folds ASCII letters."""
+    return text.translate(_ASCII_LOWER) if connection.vendor == 'sqlite' else text.lower()
+
+
+def summary_filter(params):
+    """Returns the TaskSummary lookup for a set of normalized task_list filters.
+
+    Names match exactly, like summary_matches(): a LIKE on the packed name columns ignores case on SQLite.
+    """
+    filters = Q()
+    if params.get('status'):
+        filters &= Q(status=params['status'])
+    if params.get('priority'):
+        filters &= Q(priority=params['priority'])
+    if params.get('category'):
+        filters &= Q(category_name=params['category'])
+    if params.get('tag'):
+        filters &= TaskSummary.tagged_filter(params['tag'])
+    if params.get('due_date'):
+        filters &= Q(due_date=params['due_date'])
+    if params.get('assigned_to'):
+        filters &= TaskSummary.assigned_filter(username=params['assigned_to'])
+    if params.get('search'):
+        filters &= Q(title__icontains=params['search']) | Q(description__icontains=params['search'])
+    return filters
+
+
+def summary_matches(summary, params):
+    """Evaluates summary_filter() against one in-memory summary row."""
+    if params.get('status') and summary.status != params['status']:
+        return False
+    if params.get('priority') and summary.priority != params['priority']:
+        return False
+    if params.get('category') and summary.category_name != params['category']:
+        return False
+    if params.get('tag') and TaskSummary.name_lookup(params['tag']) not in summary.tag_names:
+        return False
+    if params.get('due_date') and str(summary.due_date) != params['due_date']:
+        return False
+    if params.get('assigned_to') and TaskSummary.name_lookup(params['assigned_to']) not in summary.assignee_usernames:
+        return False
+    if params.get('search'):
+        term = _fold_case(params['search'])
+        if term not in _fold_case(summary.title) and term not in _fold_case(summary.description):
+            return False
+    return True
+
+
+def active_views(workspace_ids):
+    """Returns [(view id, workspace id, filters)] of the saved views in the given workspaces.
+
+    Read from the database on every sync: a per-process cached list would miss views saved or
+    deleted through other workers.
+    """
+    return list(
+        SavedView.objects.filter(workspace_id__in=workspace_ids).values_list('pk', 'workspace_id', 'filters')
+    )
+
+
+def sync_saved_views(summaries):
+    """Moves the given tasks into or out of every saved view they now (do not) match.
+
+    Matching runs in memory, so the cost is four statements per call however many views exist.
+    """
+    summaries = list(summaries)
+    if not summaries:
+        return
+    views = active_views({summary.workspace_id for summary in summaries})
+    if not views:
+        return
+
+    matches = {}
+    for view_id, workspace_id, filters in views:
+        task_ids = [
+            summary.pk for summary in summaries
+            if summary.workspace_id == workspace_id and summary_matches(summary, filters)
+        ]
+        if task_ids:
+            matches[view_id] = task_ids
+    task_ids = [summary.pk for summary in summaries]
+    matching = reduce(or_, (Q(view_id=view_id, task_id__in=ids) for view_id, ids in matches.items()), Q(pk__in=[]))
+
+    now = timezone.now()
+    with transaction.atomic():
+        SavedViewEntry.objects.filter(task_id__in=task_ids).exclude(matching).delete()
+        if matches:
+            SavedViewEntry.objects.filter(matching).update(changed_at=now)
+            SavedViewEntry.objects.bulk_create(
+                [
+                    SavedViewEntry(view_id=view_id, task_id=task_id, changed_at=now)
+                    for view_id, ids in matches.items() for task_id in ids
+                ],
+                ignore_conflicts=True,
+            )
+
+
+def mark_changed(task_ids):
+    """Flags tasks as changed in every view that contains them, e.g. after a new comment."""
+    SavedViewEntry.objects.filter(task_id__in=task_ids).update(changed_at=timezone.now())
+
+
+def materialize(view, batch_size=1000):
+    """Recomputes a view's task set from scratch; only needed when the view or the summaries are rebuilt."""
+    task_ids = (
+        TaskSummary.all_objects.filter(summary_filter(view.filters), workspace_id=view.workspace_id)
+        .order_by('task_id').values_list('task_id', flat=True)
+    )
+    with transaction.atomic():
+        view.entries.all().delete()
+        batch = []
+        for task_id in task_ids.iterator(chunk_size=batch_size):
+            batch.append(SavedViewEntry(view=view, task_id=task_id, changed_at=view.last_opened_at))
+            if len(batch) >= batch_size:
+                SavedViewEntry.objects.bulk_create(batch)
+                batch = []
+        SavedViewEntry.objects.bulk_create(batch)
+
+
+def rematerialize_all():
+    """Recomputes every saved view, after the summary table was rebuilt."""
+    for view in SavedView.objects.all():
+        materialize(view)
+
+
+def save_view(user, name, params):
+    """Creates (or redefines) a named view from task_list filters and materializes its task set."""
+    filters = {name: params[name] for name in SAVED_VIEW_FILTERS if params.get(name)}
+    view, _ = SavedView.objects.update_or_create(
+        user=user, name=name, defaults={'filters': filters, 'last_opened_at': timezone.now()}
+    )
+    materialize(view)
+    return view
+
+
+def with_unread_counts(views):
+    """Annotates views with `unread`: tasks that entered or changed since the view was last opened."""
+    return views.annotate(unread=Count('entries', filter=Q(entries__changed_at__gt=F('last_opened_at'))))
+
+
+def open_view(view, page_number=1, page_size=SAVED_VIEW_PAGE_SIZE):
+    """Returns one page of a view's tasks and the ids on it that changed since the last visit.
+
+    Marks the view as read.
+    """
+    entries = view.entries.order_by('task_id').values_list('task_id', 'changed_at')
+    page = Paginator(entries, page_size).get_page(page_number)
+    task_ids = [task_id for task_id, _ in page]
+    changed_ids = {task_id for task_id, changed_at in page if changed_at > view.last_opened_at}
+    summaries = TaskSummary.objects.filter(pk__in=task_ids).order_by('task_id')
+
+    SavedView.objects.filter(pk=view.pk).update(last_opened_at=timezone.now())
+    return page, summaries, changed_ids
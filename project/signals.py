@@ -1,22 +1,252 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
 from django.contrib.auth.models import User
 from django.dispatch import receiver
-from .models import Profile
+from .models import Profile, Task, Category, Tag, Comment, Attachment, TaskSummary, TaskEvent, SavedView, Workspace
+from .summaries import refresh_task_summary
+from .counters import record_activity
+from .analytics import record_transition
+from .events import record_events
+from .fragments import invalidate_fragments
+from .identity import invalidate_user, invalidate_profile
+from .calendar_feeds import invalidate_feeds
+from .board import append_rank
+from .hierarchy import add_task_node, move_subtree
+from .saved_views import sync_saved_views
+from .workspaces import NO_WORKSPACE, current_workspace
 
-# Signal to create a profile when a new user is created
+# New rows land in the workspace of the request creating them (the default one outside requests)
+@receiver(pre_save, sender=Task)
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Tag)
+@receiver(pre_save, sender=Profile)
+@receiver(pre_save, sender=SavedView)
+def assign_workspace(sender, instance, **kwargs):
+    if instance.workspace_id is None:
+        workspace_id = current_workspace.get()
+        # A write may create the default workspace that a read-only request could not
+        if workspace_id is None or workspace_id == NO_WORKSPACE:
+            workspace_id = Workspace.default_id()
+        instance.workspace_id = workspace_id
+
+
+# Single profile-sync path: create the profile once, when the user is created
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
-        # Only create a profile if it doesn't already exist for the user
         Profile.objects.get_or_create(user=instance)
 
-# Signal to save the user profile when the user is saved
+
+# Drop cached identities whenever the underlying rows change
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    try:
-        # Save the profile associated with the user
-        if hasattr(instance, 'profile'):
-            instance.profile.save()
-    except Profile.DoesNotExist:
-        # If no profile exists for the user, log an error
-        print(f"No profile exists for user: {instance.username}")
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    invalidate_profile(instance.user_id)
+
+
+# Keep the denormalized task summary in sync with its source rows
+def _related_task_ids(instance):
+    # Read the through table directly: a user's tasks may span workspaces
+    if isinstance(instance, User):
+        links = Task.assigned_to.through.objects.filter(user=instance)
+    else:
+        links = Task.tags.through.objects.filter(tag=instance)
+    return list(links.values_list('task_id', flat=True))
+
+
+@receiver(post_save, sender=Task)
+def sync_task_summary(sender, instance, **kwargs):
+    refresh_task_summary(instance.pk)
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def sync_task_summary_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        refresh_task_summary(instance.pk)
+        return
+    # Changed from the Tag/User side: pk_set holds task ids (None on clear, so use what was cached)
+    task_ids = pk_set if pk_set is not None else getattr(instance, '_summary_task_ids', ())
+    for task_id in task_ids:
+        refresh_task_summary(task_id)
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def remember_cleared_tasks(sender, instance, action, reverse, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._summary_task_ids = _related_task_ids(instance)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        record_activity(instance.task_id, comments=1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    record_activity(instance.task_id, comments=-1)
+
+
+@receiver(post_save, sender=Attachment)
+def count_new_attachment(sender, instance, created, **kwargs):
+    if created:
+        record_activity(instance.task_id, attachments=1)
+
+
+@receiver(post_delete, sender=Attachment)
+def count_deleted_attachment(sender, instance, **kwargs):
+    record_activity(instance.task_id, attachments=-1)
+
+
+@receiver(post_save, sender=Category)
+def sync_category_name(sender, instance, created, **kwargs):
+    if not created:
+        TaskSummary.objects.filter(task__category=instance).update(category_name=instance.name)
+        sync_saved_views(TaskSummary.objects.filter(task__category=instance))
+        invalidate_feeds(
+            Task.assigned_to.through.objects.filter(task__category=instance).values_list('user_id', flat=True)
+        )
+
+
+@receiver(post_delete, sender=Category)
+def clear_category_name(sender, instance, **kwargs):
+    # Names are only unique per workspace, and deletes may happen outside a request
+    summaries = TaskSummary.all_objects.filter(workspace_id=instance.workspace_id, category_name=instance.name)
+    task_ids = list(summaries.values_list('task_id', flat=True))
+    summaries.update(category_name='')
+    sync_saved_views(TaskSummary.all_objects.filter(task_id__in=task_ids))
+
+
+@receiver(post_save, sender=Tag)
+def sync_tag_name(sender, instance, created, **kwargs):
+    if created:
+        return
+    # Compared in Python: a LIKE on the packed column ignores case on SQLite and would skip case-only renames
+    lookup = TaskSummary.name_lookup(instance.name)
+    summaries = TaskSummary.all_objects.filter(task__tags=instance).values_list('task_id', 'tag_names')
+    for task_id, tag_names in summaries:
+        if lookup not in tag_names:
+            refresh_task_summary(task_id)
+
+
+@receiver(post_save, sender=User)
+def sync_assignee_username(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and 'username' not in update_fields):
+        return
+    lookup = TaskSummary.name_lookup(instance.username)
+    summaries = TaskSummary.all_objects.filter(task__assigned_to=instance).values_list('task_id', 'assignee_usernames')
+    for task_id, assignee_usernames in summaries:
+        if lookup not in assignee_usernames:
+            refresh_task_summary(task_id)
+
+
+# Deleting a Tag or User drops its M2M rows without m2m_changed, so refresh the affected tasks afterwards
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=User)
+def remember_related_tasks(sender, instance, **kwargs):
+    instance._summary_task_ids = _related_task_ids(instance)
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=User)
+def refresh_related_tasks(sender, instance, **kwargs):
+    for task_id in getattr(instance, '_summary_task_ids', ()):
+        refresh_task_summary(task_id)
+
+
+# New tasks go to the bottom of their board column
+@receiver(pre_save, sender=Task)
+def assign_board_rank(sender, instance, **kwargs):
+    if instance._state.adding and not instance.rank:
+        instance.rank = append_rank(instance.status)
+
+
+# Capture the stored values before a save so transitions can be logged and rolled up
+@receiver(pre_save, sender=Task)
+def remember_previous_values(sender, instance, **kwargs):
+    instance._previous_values = {}
+    if not instance._state.adding:
+        instance._previous_values = (
+            Task.objects.filter(pk=instance.pk).values('status', 'priority', 'due_date', 'parent_id').first() or {}
+        )
+
+
+# Keep the closure table in step with Task.parent
+@receiver(post_save, sender=Task)
+def sync_task_closure(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_values', {})
+    if created:
+        add_task_node(instance.pk, instance.parent_id)
+    elif 'parent_id' in previous and previous['parent_id'] != instance.parent_id:
+        move_subtree(instance.pk, instance.parent_id)
+
+
+@receiver(post_save, sender=Task)
+def rollup_status_transition(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_values', {})
+    record_transition(instance.workspace_id, previous.get('status'), instance.status, created=created)
+
+
+@receiver(post_save, sender=Task)
+def log_task_changes(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_values', {})
+    record_events([
+        (instance.pk, TaskEvent.STATUS, previous.get('status'), instance.status),
+        (instance.pk, TaskEvent.PRIORITY, previous.get('priority'), instance.priority),
+        (instance.pk, TaskEvent.DUE_DATE, previous.get('due_date'), instance.due_date),
+    ])
+
+
+# Assignee events store the affected user's id in new_value for both additions and removals
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def log_assignee_changes(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        instance._cleared_assignee_pks = (
+            _related_task_ids(instance) if reverse else list(instance.assigned_to.values_list('pk', flat=True))
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    field = TaskEvent.ASSIGNEE_ADDED if action == 'post_add' else TaskEvent.ASSIGNEE_REMOVED
+    related = pk_set if pk_set is not None else getattr(instance, '_cleared_assignee_pks', ())
+    record_events(
+        (pk, field, None, instance.pk) if reverse else (instance.pk, field, None, pk) for pk in related
+    )
+
+
+# Role changes alter which controls a cached list fragment shows
+@receiver(post_save, sender=Profile)
+def invalidate_list_fragments(sender, instance, **kwargs):
+    invalidate_fragments('task_list')
+
+
+# Deleting a task removes its summary by cascade, which sends no signal that reaches the summary code
+@receiver(post_delete, sender=Task)
+def invalidate_deleted_task_fragments(sender, instance, **kwargs):
+    invalidate_fragments('task_list')
+
+
+# Calendar feeds of users who just lost a task are stale too; refresh_task_summary covers current assignees
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def invalidate_unassigned_feeds(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_remove', 'post_clear'):
+        return
+    if reverse:
+        invalidate_feeds([instance.pk])
+    else:
+        invalidate_feeds(pk_set if pk_set is not None else getattr(instance, '_cleared_assignee_pks', ()))
+
+
+@receiver(pre_delete, sender=Task)
+def invalidate_deleted_task_feeds(sender, instance, **kwargs):
+    invalidate_feeds(instance.assigned_to.values_list('pk', flat=True))
@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+# Cold django.setup() must finish within this many milliseconds (overridable for slow CI machines)
+STARTUP_BUDGET_MS = int(os.environ.get('STARTUP_BUDGET_MS', 1000))
+
+# Optional or feature-specific libraries that must only be imported where they are used
+DEFERRED_MODULES = ('bs4', 'PIL', 'brotli')
+
+# Runs in a fresh interpreter. Django loads settings, apps and models through importlib.import_module,
+# which -X importtime does not report, so those calls are routed through __import__ instead.
+_CHILD_SCRIPT = """
+import importlib, importlib.util, json, sys, time
+
+def import_module(name, package=None):
+    name = importlib.util.resolve_name(name, package)
+    __import__(name)
+    return sys.modules[name]
+
+importlib.import_module = import_module
+start = time.perf_counter()
+import django
+django.setup()
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({'setup_ms': elapsed, 'modules': sorted(sys.modules)}))
+"""
+
+
+def _parse_importtime(output):
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        imports.append({
+            'module': name.strip(),
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us),
+        })
+    return imports
+
+
+def profile_startup(trace_imports=True):
+    """Boots the project in a new interpreter and reports how long django.setup() took.
+
+    Returns {'setup_ms', 'modules', 'imports'}; 'imports' is empty unless trace_imports is set,
+    which also slows the boot a little.
+    """
+    command = [sys.executable]
+    if trace_imports:
+        command += ['-X', 'importtime']
+    command += ['-c', _CHILD_SCRIPT]
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+    result = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True)
+
+    profile = json.loads(result.stdout.strip().splitlines()[-1])
+    profile['imports'] = _parse_importtime(result.stderr) if trace_imports else []
+    return profile
+
+
+def deferred_modules_loaded(modules):
+    """Returns the DEFERRED_MODULES (or their submodules) found among the loaded module names."""
+    return sorted({
+        name.split('.')[0] for name in modules if name.split('.')[0] in DEFERRED_MODULES
+    })
@@ -0,0 +1,103 @@
+// Loads board columns page by page and persists drag-and-drop moves one card at a time.
+(function () {
+    var board = document.getElementById('task-board');
+    if (!board || !window.fetch) {
+        return;
+    }
+    var csrfToken = board.querySelector('[name=csrfmiddlewaretoken]').value;
+    var dragged = null;
+
+    function loadColumn(column, cursor) {
+        var url = column.dataset.url + (cursor ? '?cursor=' + encodeURIComponent(cursor) : '');
+        return fetch(url, {credentials: 'same-origin'})
+            .then(function (response) { return response.text(); })
+            .then(function (html) {
+                column.querySelectorAll('.board-loading, .board-more').forEach(function (node) { node.remove(); });
+                column.insertAdjacentHTML('beforeend', html);
+            });
+    }
+
+    function reloadColumn(column) {
+        column.innerHTML = '';
+        return loadColumn(column);
+    }
+
+    function cardAfter(column, y) {
+        var cards = Array.prototype.slice.call(column.querySelectorAll('.board-card:not(.dragging)'));
+        for (var i = 0; i < cards.length; i++) {
+            var box = cards[i].getBoundingClientRect();
+            if (y < box.top + box.height / 2) {
+                return cards[i];
+            }
+        }
+        return null;
+    }
+
+    board.querySelectorAll('.board-column').forEach(function (column) {
+        loadColumn(column);
+
+        column.addEventListener('click', function (event) {
+            if (event.target.classList.contains('board-more')) {
+                loadColumn(column, event.target.dataset.cursor);
+            }
+        });
+
+        column.addEventListener('dragover', function (event) {
+            if (!dragged) {
+                return;
+            }
+            event.preventDefault();
+            var after = cardAfter(column, event.clientY);
+            var more = column.querySelector('.board-more');
+            column.insertBefore(dragged, after || more);
+        });
+
+        column.addEventListener('drop', function (event) {
+            event.preventDefault();
+            if (!dragged) {
+                return;
+            }
+            var card = dragged;
+            var source = card.dataset.sourceColumn;
+            var before = card.previousElementSibling;
+            var after = card.nextElementSibling;
+            var data = new FormData();
+            data.append('task_id', card.dataset.taskId);
+            data.append('status', column.dataset.status);
+            data.append('before_id', before && before.classList.contains('board-card') ? before.dataset.taskId : '');
+            data.append('after_id', after && after.classList.contains('board-card') ? after.dataset.taskId : '');
+            fetch(board.dataset.moveUrl, {
+                method: 'POST',
+                body: data,
+                credentials: 'same-origin',
+                headers: {'X-CSRFToken': csrfToken}
+            }).then(function (response) {
+                if (!response.ok) {
+                    // Stale or forbidden move: show the server's order again
+                    reloadColumn(column);
+                    if (source && source !== column.dataset.status) {
+                        reloadColumn(board.querySelector('.board-column[data-status="' + source + '"]'));
+                    }
+                }
+            });
+        });
+    });
+
+    board.addEventListener('dragstart', function (event) {
+        var card = event.target.closest && event.target.closest('.board-card');
+        if (!card) {
+            return;
+        }
+        dragged = card;
+        card.dataset.sourceColumn = card.closest('.board-column').dataset.status;
+        card.classList.add('dragging');
+        event.dataTransfer.effectAllowed = 'move';
+    });
+
+    board.addEventListener('dragend', function () {
+        if (dragged) {
+            dragged.classList.remove('dragging');
+            dragged = null;
+        }
+    });
+})();
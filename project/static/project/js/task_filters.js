@@ -0,0 +1,83 @@
+// Re-fetches only the task result list when a filter changes instead of reloading the page.
+(function () {
+    var form = document.getElementById('task-filters');
+    var results = document.getElementById('task-results');
+    if (!form || !results || !window.fetch) {
+        return;
+    }
+
+    var pending = null;
+
+    function query() {
+        var params = new URLSearchParams();
+        new FormData(form).forEach(function (value, name) {
+            if (value) {
+                params.append(name, value);
+            }
+        });
+        return params.toString();
+    }
+
+    function refresh() {
+        var qs = query();
+        var url = results.dataset.fragmentUrl + (qs ? '?' + qs : '');
+        if (pending) {
+            pending.abort();
+        }
+        pending = new AbortController();
+        fetch(url, {headers: {'X-Fragment': 'results'}, credentials: 'same-origin', signal: pending.signal})
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error(response.status);
+                }
+                return response.text();
+            })
+            .then(function (html) {
+                results.innerHTML = html;
+                window.history.replaceState(null, '', url);
+            })
+            .catch(function (error) {
+                if (error.name !== 'AbortError') {
+                    form.submit();
+                }
+            });
+    }
+
+    var timer = null;
+    form.addEventListener('change', refresh);
+    form.addEventListener('input', function (event) {
+        if (event.target.name === 'search') {
+            clearTimeout(timer);
+            timer = setTimeout(refresh, 300);
+        }
+    });
+    form.addEventListener('submit', function (event) {
+        event.preventDefault();
+        refresh();
+    });
+})();
+
+// Saves whatever the filter form currently shows, even after in-place refreshes changed it.
+(function () {
+    var form = document.getElementById('task-filters');
+    var saveForm = document.getElementById('save-view');
+    if (!form || !saveForm) {
+        return;
+    }
+
+    saveForm.addEventListener('submit', function () {
+        saveForm.querySelectorAll('.view-filter').forEach(function (input) {
+            input.remove();
+        });
+        new FormData(form).forEach(function (value, name) {
+            if (value && name !== 'archived') {
+                var input = document.createElement('input');
+                input.type = 'hidden';
+                input.className = 'view-filter';
+                input.name = name;
+                input.value = value;
+                saveForm.appendChild(input);
+            }
+        });
+    });
+})();
@@ -0,0 +1,46 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+
+def _load_brotli():
+    # Imported on first use so that serving requests never pays for it; only collectstatic compresses
+    try:
+        import brotli
+    except ImportError:  # Brotli is optional; without it only gzip variants are written
+        return None
+    return brotli
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes .gz and .br variants of every hashed text asset."""
+
+    compress_extensions = ('.css', '.js', '.svg', '.txt', '.json', '.html', '.map')
+    compress_min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(self.compress_extensions):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as source:
+            data = source.read()
+        if len(data) < self.compress_min_size:
+            return
+
+        variants = [('gz', gzip.compress(data, compresslevel=9, mtime=0))]
+        brotli = _load_brotli()
+        if brotli is not None:
+            variants.append(('br', brotli.compress(data, quality=11)))
+        for suffix, compressed in variants:
+            if len(compressed) >= len(data):
+                continue
+            compressed_name = f"{name}.{suffix}"
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
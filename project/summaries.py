@@ -0,0 +1,84 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task, TaskSummary
+from .fragments import invalidate_fragments
+from .calendar_feeds import invalidate_feeds
+from .saved_views import sync_saved_views, mark_changed, rematerialize_all
+
+
+def build_task_summary(task):
+    """Builds an unsaved TaskSummary row from a task and its related objects."""
+    return TaskSummary(
+        task_id=task.pk,
+        workspace_id=task.workspace_id,
+        title=task.title,
+        description=task.description,
+        due_date=task.due_date,
+        priority=task.priority,
+        status=task.status,
+        category_name=task.category.name if task.category else '',
+        tag_names=TaskSummary.pack_names(tag.name for tag in task.tags.all()),
+        assignee_usernames=TaskSummary.pack_names(user.username for user in task.assigned_to.all()),
+        comment_count=task.comment_count,
+        attachment_count=task.attachment_count,
+        last_activity_at=task.last_activity_at,
+    )
+
+
+def refresh_task_summary(task_id):
+    """Recomputes the summary row of a single task."""
+    # Unscoped: a task missing from the current workspace must not look deleted
+    task = (
+        Task.all_objects.select_related('category')
+        .prefetch_related('tags', 'assigned_to')
+        .filter(pk=task_id)
+        .first()
+    )
+    invalidate_fragments('task_list')
+    if task is None:
+        TaskSummary.all_objects.filter(task_id=task_id).delete()
+        return None
+
+    summary = build_task_summary(task)
+    summary.save()
+    sync_saved_views([summary])
+    invalidate_feeds(user.pk for user in task.assigned_to.all())
+    return summary
+
+
+def bump_activity(task_id, comments=0, attachments=0, at=None):
+    """Adjusts the cached counters of a task summary without recomputing the row."""
+    TaskSummary.all_objects.filter(task_id=task_id).update(
+        comment_count=F('comment_count') + comments,
+        attachment_count=F('attachment_count') + attachments,
+        last_activity_at=at or timezone.now(),
+    )
+    mark_changed([task_id])
+    invalidate_fragments('task_list')
+
+
+def rebuild_task_summaries(batch_size=500):
+    """Rebuilds the whole summary table from the normalized tables."""
+    tasks = (
+        Task.all_objects.select_related('category')
+        .prefetch_related('tags', 'assigned_to')
+        .order_by('pk')
+    )
+    rebuilt = 0
+    with transaction.atomic():
+        TaskSummary.all_objects.all().delete()
+        batch = []
+        for task in tasks.iterator(chunk_size=batch_size):
+            batch.append(build_task_summary(task))
+            if len(batch) >= batch_size:
+                TaskSummary.objects.bulk_create(batch)
+                rebuilt += len(batch)
+                batch = []
+        if batch:
+            TaskSummary.objects.bulk_create(batch)
+            rebuilt += len(batch)
+        rematerialize_all()
+    invalidate_fragments('task_list')
+    return rebuilt
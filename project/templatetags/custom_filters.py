@@ -9,3 +9,15 @@ def add_class(value, css_class):
     if hasattr(value, 'widget'):
         value.widget.attrs['class'] = value.widget.attrs.get('class', '') + ' ' + css_class
     return value
+
+
+@register.filter
+def can_edit(permissions, task_id):
+    """Checks an already-loaded TaskPermissions for the edit action."""
+    return permissions.can_edit(task_id)
+
+
+@register.filter
+def can_delete(permissions, task_id):
+    """Checks an already-loaded TaskPermissions for the delete action."""
+    return permissions.can_delete(task_id)
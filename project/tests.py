@@ -1,3 +1,914 @@
-from django.test import TestCase
+from contextlib import contextmanager
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .admin import EstimatedCountPaginator
+from .analytics import backfill_throughput, latest_snapshot, record_transition, snapshot_open_tasks, throughput_series
+from .archive import archive_completed_tasks, restore_task
+from .board import RANK_DIGITS, column_page, move_task, rank_after, rank_before, rank_between
+from .bulk import bulk_update_tasks
+from .counters import reconcile_task_counters
+from .events import archive_events, current_actor, task_history, user_history
+from .forms import TaskForm
+from .hierarchy import ancestors, completion, descendants, rebuild_closure, with_completion
+from .identity import get_cached_user
+from .models import (
+    ArchivedTask, Attachment, Category, Comment, DailyTaskThroughput, Profile, Tag, Task, TaskClosure, TaskDependency,
+    TaskEvent, TaskEventArchive, TaskSummary, Workspace,
+)
+from .permissions import TaskPermissions
+from .saved_views import materialize, save_view
+from .startup import STARTUP_BUDGET_MS, deferred_modules_loaded, profile_startup
+from .summaries import rebuild_task_summaries
+from .workspaces import current_workspace
+
+
+class StartupBudgetTests(SimpleTestCase):
+    """Boots the project in a fresh interpreter, the way a new worker or cron job does."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.profile = profile_startup(trace_imports=False)
+
+    def test_cold_startup_within_budget(self):
+        self.assertLess(
+            self.profile['setup_ms'], STARTUP_BUDGET_MS,
+            "django.setup() is over budget; run `manage.py profile_imports` to find the slow imports.",
+        )
+
+    def test_deferred_modules_not_imported_at_startup(self):
+        self.assertEqual(deferred_modules_loaded(self.profile['modules']), [])
+
+
+@contextmanager
+def in_workspace(workspace):
+    """Scopes the block to a workspace, as WorkspaceMiddleware does for a request."""
+    token = current_workspace.set(workspace.pk)
+    try:
+        yield
+    finally:
+        current_workspace.reset(token)
+
+
+def create_task(user, created_by=None, **fields):
+    fields.setdefault('title', 'Task')
+    fields.setdefault('due_date', date.today() + timedelta(days=7))
+    task = Task.objects.create(created_by=created_by or user, **fields)
+    task.assigned_to.add(user)
+    return task
+
+
+def create_user(username, workspace=None, role='Officer'):
+    user = User.objects.create_user(username, password='pw')
+    Profile.all_objects.filter(user=user).update(role=role, **({'workspace': workspace} if workspace else {}))
+    return user
+
+
+class WorkspaceIsolationTests(TestCase):
+    """Nothing of one workspace may show up in another's pages, forms, analytics or feeds."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alpha = Workspace.objects.create(name='Alpha', slug='alpha')
+        cls.beta = Workspace.objects.create(name='Beta', slug='beta')
+        cls.ann = create_user('ann', cls.alpha, role='Manager')
+        cls.ben = create_user('ben', cls.beta, role='Manager')
+        with in_workspace(cls.alpha):
+            cls.alpha_category = Category.objects.create(name='Shared')
+            cls.alpha_task = create_task(cls.ann, title='Alpha plan', category=cls.alpha_category)
+        with in_workspace(cls.beta):
+            Category.objects.create(name='Shared')
+            cls.secret_category = Category.objects.create(name='SecretB')
+            Tag.objects.create(name='secret-tag')
+            cls.beta_task = create_task(
+                cls.ben, title='Beta secret', category=cls.secret_category, due_date=date.today() - timedelta(days=1)
+            )
+
+    def test_new_rows_join_the_current_workspace(self):
+        self.assertEqual(self.alpha_task.workspace_id, self.alpha.pk)
+        self.assertEqual(self.secret_category.workspace_id, self.beta.pk)
+        self.assertEqual(TaskSummary.all_objects.get(task=self.beta_task).workspace_id, self.beta.pk)
+
+    def test_task_list_shows_only_own_workspace(self):
+        self.client.force_login(self.ann)
+        response = self.client.get(reverse('task_list'))
+        self.assertContains(response, 'Alpha plan')
+        self.assertNotContains(response, 'Beta secret')
+        self.assertNotContains(response, 'SecretB')
+        self.assertEqual([user.username for user in response.context['users']], ['ann'])
+
+    def test_other_workspace_task_is_not_found(self):
+        self.client.force_login(self.ann)
+        for name in ('task_detail', 'task_update', 'task_delete'):
+            response = self.client.get(reverse(name, args=[self.beta_task.pk]))
+            self.assertEqual(response.status_code, 404, name)
+
+    def test_task_form_offers_only_own_workspace(self):
+        with in_workspace(self.alpha):
+            form = TaskForm()
+            self.assertEqual(list(form.fields['assigned_to'].queryset), [self.ann])
+            self.assertEqual(list(form.fields['category'].queryset), [self.alpha_category])
+            self.assertFalse(form.fields['tags'].queryset.exists())
+            form = TaskForm(data={
+                'title': 'Sneaky', 'due_date': date.today().isoformat(), 'priority': 'Low', 'status': 'Pending',
+                'assigned_to': [self.ben.pk], 'category': self.secret_category.pk, 'parent': self.beta_task.pk,
+            })
+            self.assertFalse(form.is_valid())
+            self.assertEqual(set(form.errors), {'assigned_to', 'category', 'parent'})
+
+    def test_analytics_are_scoped(self):
+        snapshot_open_tasks()
+        backfill_throughput()
+        self.client.force_login(self.ann)
+        payload = self.client.get(reverse('task_analytics')).json()
+        self.assertNotIn('SecretB', payload['overdue']['category'])
+        self.assertNotIn('ben', payload['overdue']['assignee'])
+        self.assertEqual(payload['throughput'][-1]['created'], 1)
+
+        self.client.force_login(self.ben)
+        payload = self.client.get(reverse('task_analytics')).json()
+        self.assertEqual(payload['overdue']['category'], {'SecretB': 1})
+
+    def test_calendar_feeds_are_scoped(self):
+        token = Profile.all_objects.get(user=self.ann).calendar_token
+        response = self.client.get(reverse('calendar_feed', args=[token]))
+        self.assertContains(response, 'Alpha plan')
+        self.assertNotContains(response, 'Beta secret')
+        response = self.client.get(reverse('category_calendar_feed', args=[token, self.secret_category.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_category_delete_leaves_same_name_in_other_workspaces(self):
+        with in_workspace(self.beta):
+            beta_shared_task = create_task(self.ben, category=Category.objects.get(name='Shared'))
+        self.alpha_category.delete()
+        self.assertEqual(TaskSummary.all_objects.get(task=self.alpha_task).category_name, '')
+        self.assertEqual(TaskSummary.all_objects.get(task=beta_shared_task).category_name, 'Shared')
+
+
+class TaskPermissionTests(TestCase):
+    """Role and ownership rules of permissions.ROLE_RULES."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = create_user('manager', role='Manager')
+        cls.sub_manager = create_user('sub', role='Sub-Manager')
+        cls.officer = create_user('officer')
+        cls.colleague = create_user('colleague')
+        cls.own_task = create_task(cls.officer, title='Own')
+        cls.sub_task = create_task(cls.sub_manager, title='Sub own')
+        cls.assigned_task = create_task(cls.officer, created_by=cls.colleague, title='Assigned')
+        cls.other_task = create_task(cls.colleague, title='Other')
+
+    def assertAllowed(self, user, expected):
+        permissions = TaskPermissions(user)
+        for task, (can_edit, can_delete) in expected.items():
+            self.assertEqual(permissions.can_edit(task.pk), can_edit, f"{user} edit {task.title}")
+            self.assertEqual(permissions.can_delete(task.pk), can_delete, f"{user} delete {task.title}")
+
+    def test_manager_may_edit_and_delete_any_task(self):
+        self.assertAllowed(self.manager, {
+            self.own_task: (True, True), self.assigned_task: (True, True), self.other_task: (True, True),
+        })
+
+    def test_sub_manager_may_edit_any_but_delete_only_own(self):
+        self.assertAllowed(self.sub_manager, {
+            self.sub_task: (True, True), self.own_task: (True, False), self.other_task: (True, False),
+        })
+
+    def test_officer_may_edit_own_and_assigned_and_delete_own(self):
+        self.assertAllowed(self.officer, {
+            self.own_task: (True, True), self.assigned_task: (True, False), self.other_task: (False, False),
+        })
+
+    def test_staff_may_do_everything_and_anonymous_nothing(self):
+        self.officer.is_staff = True
+        self.assertAllowed(self.officer, {self.other_task: (True, True)})
+        self.assertAllowed(AnonymousUser(), {self.own_task: (False, False)})
+
+    def test_permissions_load_in_bulk(self):
+        tasks = [self.own_task, self.sub_task, self.assigned_task, self.other_task]
+        permissions = TaskPermissions(self.officer)
+        # Role, creators and assignments, however many tasks
+        with self.assertNumQueries(3):
+            permissions.load([task.pk for task in tasks])
+        with self.assertNumQueries(0):
+            self.assertEqual([permissions.can_edit(task.pk) for task in tasks], [True, False, True, False])
+
+    def test_views_refuse_actions_the_role_lacks(self):
+        self.client.force_login(self.officer)
+        response = self.client.post(reverse('task_delete', args=[self.assigned_task.pk]))
+        self.assertRedirects(response, reverse('task_list'))
+        self.assertTrue(Task.objects.filter(pk=self.assigned_task.pk).exists())
+        response = self.client.post(reverse('task_update', args=[self.other_task.pk]), {'title': 'Changed'})
+        self.assertRedirects(response, reverse('task_list'))
+        self.assertEqual(Task.objects.get(pk=self.other_task.pk).title, 'Other')
+
+        response = self.client.post(reverse('task_delete', args=[self.own_task.pk]))
+        self.assertRedirects(response, reverse('task_list'))
+        self.assertFalse(Task.objects.filter(pk=self.own_task.pk).exists())
+
+    def test_tasks_created_in_the_ui_belong_to_their_creator(self):
+        self.client.force_login(self.officer)
+        data = {
+            'title': 'From the form', 'due_date': date.today().isoformat(), 'priority': 'Low', 'status': 'Pending',
+        }
+        response = self.client.post(reverse('task_create'), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('assigned_to', response.context['form'].errors)
+
+        response = self.client.post(reverse('task_create'), {**data, 'assigned_to': [self.colleague.pk]})
+        self.assertRedirects(response, reverse('task_list'))
+        task = Task.objects.get(title='From the form')
+        self.assertEqual(task.created_by, self.officer)
+        self.assertEqual(list(task.assigned_to.all()), [self.colleague])
+        # Owned but not assigned: an officer may still edit and delete it
+        self.assertAllowed(self.officer, {task: (True, True)})
+
+
+class TaskAdminTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', password='pw')
+        cls.officer = create_user('officer')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_add_requires_an_assignee(self):
+        data = {'title': 'From admin', 'due_date': date.today().isoformat(), 'priority': 'Low', 'status': 'Pending'}
+        response = self.client.post(reverse('admin:project_task_add'), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('assigned_to', response.context['adminform'].form.errors)
+
+        response = self.client.post(reverse('admin:project_task_add'), {**data, 'assigned_to': [self.officer.pk]})
+        self.assertRedirects(response, reverse('admin:project_task_changelist'))
+        self.assertEqual(list(Task.objects.get(title='From admin').assigned_to.all()), [self.officer])
+
+    def test_filtered_counts_stop_at_the_limit(self):
+        for number in range(3):
+            create_task(self.officer, title=f"Task {number}")
+        self.assertEqual(EstimatedCountPaginator(Task.objects.order_by('pk'), 2).count, 3)
+        with mock.patch.object(EstimatedCountPaginator, 'count_limit', 2):
+            paginator = EstimatedCountPaginator(Task.objects.filter(status='Pending').order_by('pk'), 1)
+            self.assertEqual((paginator.count, paginator.num_pages), (2, 2))
+            self.assertTrue(paginator.truncated)
+
+            response = self.client.get(reverse('admin:project_task_changelist'), {'status__exact': 'Pending'})
+            self.assertContains(response, 'only the first 2 can be paged through')
+            response = self.client.get(reverse('admin:project_task_changelist'), {'status__exact': 'Completed'})
+            self.assertNotContains(response, 'can be paged through')
+
+
+class ArchiveTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.tag = Tag.objects.create(name='ops')
+        cls.blocker = create_task(cls.user, title='Blocker')
+        cls.task = create_task(cls.user, title='Done', status='Completed')
+        cls.task.tags.add(cls.tag)
+        Comment.objects.create(task=cls.task, user=cls.user, content='Shipped')
+        Attachment.objects.create(task=cls.task, uploaded_by=cls.user, file='task_attachments/notes.pdf')
+        TaskDependency.objects.create(task=cls.task, blocked_by=cls.blocker)
+
+    def archive(self):
+        Task.objects.filter(pk=self.task.pk).update(last_activity_at=timezone.now() - timedelta(days=100))
+        return archive_completed_tasks(older_than_days=90)
+
+    def test_archive_and_restore_round_trip(self):
+        self.assertEqual(self.archive(), 1)
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+        self.assertFalse(TaskDependency.objects.exists())
+        self.assertEqual(ArchivedTask.objects.get(pk=self.task.pk).comments.count(), 1)
+
+        restore_task(self.task.pk)
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertEqual(list(task.tags.all()), [self.tag])
+        self.assertEqual(list(task.assigned_to.all()), [self.user])
+        self.assertEqual([comment.content for comment in task.comments.all()], ['Shipped'])
+        self.assertEqual(task.attachments.count(), 1)
+        self.assertEqual((task.comment_count, task.attachment_count), (1, 1))
+        self.assertEqual(list(task.dependencies.values_list('blocked_by', flat=True)), [self.blocker.pk])
+        self.assertFalse(ArchivedTask.objects.exists())
+
+        summary = TaskSummary.objects.get(task=task)
+        self.assertEqual((summary.assignee_list, summary.tag_list), (['user'], ['ops']))
+
+    def test_restored_task_is_not_archived_again(self):
+        self.archive()
+        restore_task(self.task.pk)
+        self.assertEqual(archive_completed_tasks(older_than_days=90), 0)
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertGreater(task.last_activity_at, timezone.now() - timedelta(minutes=1))
+        self.assertEqual(TaskSummary.objects.get(task=task).last_activity_at, task.last_activity_at)
+
+
+class BoardRankTests(SimpleTestCase):
+
+    def test_rank_between_sorts_strictly_between(self):
+        for low, high in [('', None), ('', 'i'), ('i', None), ('a', 'b'), ('a', 'a1'), ('az', 'b'), ('ai', 'aj')]:
+            rank = rank_between(low, high)
+            self.assertLess(low, rank)
+            if high is not None:
+                self.assertLess(rank, high)
+            self.assertNotEqual(rank[-1], RANK_DIGITS[0])
+        with self.assertRaises(ValueError):
+            rank_between('b', 'a')
+
+    def test_repeated_moves_to_either_end_grow_keys_slowly(self):
+        for step, direction in ((rank_after, 1), (rank_before, -1)):
+            keys = ['i']
+            for _ in range(100):
+                keys.append(step(keys[-1]))
+            self.assertEqual(keys[::direction], sorted(keys), step.__name__)
+            self.assertLessEqual(max(len(key) for key in keys), 4, step.__name__)
+            self.assertFalse([key for key in keys if key.endswith(RANK_DIGITS[0])], step.__name__)
+
+
+class BoardTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.tasks = [create_task(cls.user, title=name) for name in 'abcde']
+
+    def column(self, status='Pending'):
+        return list(Task.objects.filter(status=status).order_by('rank', 'pk').values_list('title', flat=True))
+
+    def move(self, title, status='Pending', before=None, after=None):
+        ids = {task.title: task.pk for task in self.tasks}
+        return move_task(
+            Task.objects.get(title=title), status,
+            ids[before] if before else None, ids[after] if after else None,
+        )
+
+    def test_move_between_below_and_above_a_card(self):
+        self.move('e', before='a', after='b')
+        self.assertEqual(self.column(), list('aebcd'))
+        # Only the card above is known: the task goes directly below it, above the next card
+        self.move('d', before='a')
+        self.assertEqual(self.column(), list('adebc'))
+        # Only the card below is known: directly above it, below the card before it
+        self.move('a', after='c')
+        self.assertEqual(self.column(), list('debac'))
+
+    def test_moves_to_the_top_and_bottom(self):
+        for _ in range(50):
+            top = self.column()[0]
+            self.move(self.column()[-1], after=top)
+        self.assertLessEqual(max(len(task.rank) for task in Task.objects.all()), 3)
+        self.move(self.column()[0])
+        self.assertEqual(self.column()[-1], 'a')
+
+    def test_move_to_another_column(self):
+        self.move('c', status='Completed')
+        self.assertEqual((self.column(), self.column('Completed')), (list('abde'), ['c']))
+        self.move('d', status='Completed', after='c')
+        self.assertEqual(self.column('Completed'), ['d', 'c'])
+
+    def test_move_writes_only_the_moved_row(self):
+        Task.objects.filter(title='a').update(rank='1')
+        Task.objects.filter(title='b').update(rank='1' + '0' * 62 + '1')
+        before = dict(Task.objects.values_list('title', 'rank'))
+        with self.assertRaises(ValueError):
+            self.move('e', before='a', after='b')
+        self.assertEqual(dict(Task.objects.values_list('title', 'rank')), before)
+
+        self.move('e', before='c', after='d')
+        changed = {title for title, rank in Task.objects.values_list('title', 'rank') if before[title] != rank}
+        self.assertEqual(changed, {'e'})
+
+    def test_stale_neighbours_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.move('a', status='Completed', before='b')
+
+    def test_column_pages_follow_rank_order(self):
+        self.move('e', before='a', after='b')
+        titles, cursor = [], None
+        while True:
+            tasks, cursor = column_page('Pending', cursor, page_size=2)
+            titles += [task.title for task in tasks]
+            if cursor is None:
+                break
+        self.assertEqual(titles, list('aebcd'))
+
+
+@override_settings(SHARED_CACHE=True)
+class FragmentCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user', role='Manager')
+        cls.task = create_task(cls.user, title='Cached task')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def fragment(self, **params):
+        return self.client.get(reverse('task_list'), {'fragment': '1', **params})
+
+    def test_repeated_requests_reuse_the_fragment(self):
+        response = self.fragment()
+        self.assertContains(response, 'Cached task')
+        # Bypasses signals, so only a cache hit still shows the old title
+        TaskSummary.objects.filter(task=self.task).update(title='Renamed quietly')
+        self.assertContains(self.fragment(), 'Cached task')
+        self.assertContains(self.fragment(search='Renamed'), 'Renamed quietly')
+
+        response = self.client.get(
+            reverse('task_list'), {'fragment': '1'}, headers={'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_task_changes_invalidate_the_fragment(self):
+        self.assertContains(self.fragment(), 'Cached task')
+        self.task.title = 'Edited task'
+        self.task.save()
+        self.assertContains(self.fragment(), 'Edited task')
+
+        self.task.delete()
+        self.assertNotContains(self.fragment(), 'Edited task')
+
+
+class TaskSummaryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('Ann')
+        cls.tag = Tag.objects.create(name='Ops')
+        cls.category = Category.objects.create(name='Work')
+        cls.task = create_task(cls.user, title='Summarised', category=cls.category)
+        cls.task.tags.add(cls.tag, Tag.objects.create(name='api'))
+
+    def summary(self):
+        return TaskSummary.objects.get(task=self.task)
+
+    def test_summary_follows_the_task_and_its_relations(self):
+        summary = self.summary()
+        self.assertEqual((summary.title, summary.category_name), ('Summarised', 'Work'))
+        self.assertEqual((summary.tag_names, summary.assignee_usernames), (',Ops,api,', ',Ann,'))
+
+        self.task.tags.remove(self.tag)
+        self.task.assigned_to.add(create_user('ben'))
+        self.category.name = 'Jobs'
+        self.category.save()
+        summary = self.summary()
+        self.assertEqual((summary.tag_list, summary.assignee_list, summary.category_name), (['api'], ['Ann', 'ben'], 'Jobs'))
+
+    def test_case_only_renames_reach_the_summary(self):
+        self.tag.name = 'ops'
+        self.tag.save()
+        self.user.username = 'ann'
+        self.user.save()
+        summary = self.summary()
+        self.assertEqual((summary.tag_list, summary.assignee_list), (['api', 'ops'], ['ann']))
+
+    def test_deleting_a_tag_or_user_updates_the_summary(self):
+        self.tag.delete()
+        self.assertEqual(self.summary().tag_list, ['api'])
+        self.task.assigned_to.add(create_user('ben'))
+        self.user.delete()
+        self.assertEqual(self.summary().assignee_list, ['ben'])
+
+    def test_list_filters_match_names_exactly(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('task_list'), {'tag': 'Ops', 'assigned_to': 'Ann'})
+        self.assertContains(response, 'Summarised')
+        for params in ({'tag': 'ops'}, {'assigned_to': 'ann'}, {'tag': 'Op'}):
+            response = self.client.get(reverse('task_list'), params)
+            self.assertNotContains(response, 'Summarised', msg_prefix=str(params))
+
+    def test_rebuild_restores_the_summaries(self):
+        expected = list(TaskSummary.objects.values())
+        TaskSummary.objects.filter(task=self.task).update(title='Drifted', tag_names='')
+        create_task(self.user, title='Second')
+        TaskSummary.objects.filter(title='Second').delete()
+
+        self.assertEqual(rebuild_task_summaries(batch_size=1), 2)
+        self.assertEqual(list(TaskSummary.objects.filter(task=self.task).values()), expected)
+        self.assertTrue(TaskSummary.objects.filter(title='Second').exists())
+
+
+class SubtaskTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.root = create_task(cls.user, title='Root')
+        cls.child = create_task(cls.user, title='Child', parent=cls.root)
+        cls.grandchild = create_task(cls.user, title='Grandchild', parent=cls.child, status='Completed')
+        cls.other = create_task(cls.user, title='Other')
+
+    def titles(self, tasks):
+        return [task.title for task in tasks]
+
+    def closure(self):
+        return set(TaskClosure.objects.values_list('ancestor_id', 'descendant_id', 'depth'))
+
+    def test_closure_follows_new_tasks(self):
+        self.assertEqual(self.titles(descendants(self.root)), ['Child', 'Grandchild'])
+        self.assertEqual(self.titles(descendants(self.root, max_depth=1)), ['Child'])
+        self.assertEqual(self.titles(ancestors(self.grandchild)), ['Root', 'Child'])
+
+    def test_moving_a_task_moves_its_subtree(self):
+        self.child.parent = self.other
+        self.child.save()
+        self.assertEqual(self.titles(descendants(self.root)), [])
+        self.assertEqual(self.titles(descendants(self.other)), ['Child', 'Grandchild'])
+        self.assertEqual(self.titles(ancestors(self.grandchild)), ['Other', 'Child'])
+
+        self.child.parent = None
+        self.child.save()
+        self.assertEqual(self.titles(ancestors(self.grandchild)), ['Child'])
+        # The incremental rows match a full rebuild
+        rows = self.closure()
+        rebuild_closure()
+        self.assertEqual(self.closure(), rows)
+
+    def test_cycles_are_rejected(self):
+        form = TaskForm(instance=self.root, data={
+            'title': 'Root', 'due_date': date.today().isoformat(), 'priority': 'Low', 'status': 'Pending',
+            'assigned_to': [self.user.pk], 'parent': self.grandchild.pk,
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('parent', form.errors)
+        for parent in (self.root, self.grandchild):
+            self.root.parent = parent
+            with self.assertRaises(ValidationError):
+                self.root.save()
+        self.assertEqual(self.titles(ancestors(Task.objects.get(pk=self.root.pk))), [])
+
+    def test_completion_rolls_up_subtasks(self):
+        self.assertEqual(completion(self.root), {'total': 2, 'completed': 1, 'percent': 50})
+        self.assertEqual(completion(self.grandchild)['percent'], 100)
+        self.assertEqual(completion(self.other)['percent'], 0)
+        counts = {
+            task.title: (task.subtask_total, task.subtask_completed)
+            for task in with_completion(Task.objects.all())
+        }
+        self.assertEqual(counts, {'Root': (2, 1), 'Child': (1, 1), 'Grandchild': (0, 0), 'Other': (0, 0)})
+
+    def test_add_subtask_from_the_detail_page(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('task_detail', args=[self.child.pk]))
+        add_url = f"{reverse('task_create')}?parent={self.child.pk}"
+        self.assertContains(response, add_url)
+        response = self.client.get(add_url)
+        self.assertEqual(response.context['form'].initial['parent'], str(self.child.pk))
+
+        response = self.client.post(add_url, {
+            'title': 'Added', 'due_date': date.today().isoformat(), 'priority': 'Low', 'status': 'Pending',
+            'assigned_to': [self.user.pk], 'parent': self.child.pk,
+        })
+        self.assertRedirects(response, reverse('task_list'))
+        self.assertEqual(self.titles(ancestors(Task.objects.get(title='Added'))), ['Root', 'Child'])
+
+
+class CalendarFeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.task = create_task(cls.user, title='Due soon')
+
+    def setUp(self):
+        cache.clear()
+        # Backdated, so a change in this test gets a later second than the first response
+        Profile.all_objects.filter(user=self.user).update(feeds_changed_at=timezone.now() - timedelta(hours=1))
+
+    def feed(self, token=None, **headers):
+        token = token or Profile.all_objects.get(user=self.user).calendar_token
+        return self.client.get(reverse('calendar_feed', args=[token]), headers=headers)
+
+    def test_conditional_requests(self):
+        for shared_cache in (False, True):
+            with self.subTest(shared_cache=shared_cache), override_settings(SHARED_CACHE=shared_cache):
+                self.setUp()
+                response = self.feed()
+                self.assertContains(response, f'SUMMARY:{self.task.title}')
+                etag, last_modified = response['ETag'], response['Last-Modified']
+                self.assertEqual(self.feed(**{'If-None-Match': etag}).status_code, 304)
+                self.assertEqual(self.feed(**{'If-Modified-Since': last_modified}).status_code, 304)
+                # A rebuild without changes keeps the validators
+                cache.clear()
+                self.assertEqual(self.feed()['Last-Modified'], last_modified)
+
+                self.task.title = f'Renamed {shared_cache}'
+                self.task.save()
+                response = self.feed(**{'If-None-Match': etag})
+                self.assertContains(response, f'SUMMARY:Renamed {shared_cache}')
+                response = self.feed(**{'If-Modified-Since': last_modified})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['Last-Modified'], last_modified)
+
+    def test_unassigned_tasks_change_the_feed(self):
+        last_modified = self.feed()['Last-Modified']
+        self.task.assigned_to.add(create_user('other'))
+        self.task.assigned_to.remove(self.user)
+        response = self.feed(**{'If-Modified-Since': last_modified})
+        self.assertNotContains(response, 'Due soon')
+
+    def test_profile_saves_keep_the_feed_timestamp(self):
+        stale = Profile.all_objects.get(user=self.user)
+        self.task.title = 'Renamed'
+        self.task.save()
+        changed_at = Profile.all_objects.get(user=self.user).feeds_changed_at
+        stale.display_name = 'User'
+        stale.save()
+        self.assertEqual(Profile.all_objects.get(user=self.user).feeds_changed_at, changed_at)
+
+    def test_token_reset_revokes_the_old_address(self):
+        old_token = Profile.all_objects.get(user=self.user).calendar_token
+        self.assertEqual(self.feed(old_token).status_code, 200)
+        self.client.force_login(self.user)
+        self.assertRedirects(self.client.post(reverse('calendar_token_reset')), reverse('profile'))
+        self.assertEqual(self.feed(old_token).status_code, 404)
+        self.assertContains(self.feed(), 'SUMMARY:Due soon')
+
+
+class SavedViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.ops = Tag.objects.create(name='Ops')
+
+    def entries(self, view):
+        return set(view.entries.values_list('task_id', flat=True))
+
+    def assertMaintained(self, view):
+        """The incrementally maintained entries equal a rebuild from scratch."""
+        maintained = self.entries(view)
+        materialize(view)
+        self.assertEqual(maintained, self.entries(view))
+        return maintained
+
+    def test_incremental_maintenance_matches_materialize(self):
+        views = [
+            save_view(self.user, 'Search', {'search': 'plan'}),
+            save_view(self.user, 'Accented', {'search': 'über'}),
+            save_view(self.user, 'Tagged', {'tag': 'Ops', 'status': 'Pending'}),
+            save_view(self.user, 'Assigned', {'assigned_to': 'user'}),
+        ]
+        tasks = [create_task(self.user, title=title) for title in ('PLAN ahead', 'über plan', 'ÜBER alles', 'Other')]
+        tasks[0].tags.add(self.ops)
+        tasks[1].tags.add(self.ops)
+        tasks[1].status = 'Completed'
+        tasks[1].save()
+        tasks[3].description = 'A Plan'
+        tasks[3].save()
+
+        search, accented, tagged, assigned = (self.assertMaintained(view) for view in views)
+        self.assertEqual(search, {tasks[0].pk, tasks[1].pk, tasks[3].pk})
+        # Only ASCII letters fold on SQLite, in the database and in memory alike
+        self.assertEqual(accented, {tasks[1].pk})
+        self.assertEqual(tagged, {tasks[0].pk})
+        self.assertEqual(assigned, {task.pk for task in tasks})
+
+        self.ops.name = 'ops'
+        self.ops.save()
+        self.assertEqual(self.assertMaintained(views[2]), set())
+
+
+class AnalyticsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user', role='Manager')
+        cls.workspace_id = Profile.all_objects.get(user=cls.user).workspace_id
+
+    def today(self):
+        return throughput_series(date.today(), date.today())[0]
+
+    def test_record_transition_counts_created_completed_and_reopened(self):
+        day = date(2026, 1, 5)
+        record_transition(self.workspace_id, None, 'Pending', created=True, day=day)
+        record_transition(self.workspace_id, 'Pending', 'Completed', day=day)
+        record_transition(self.workspace_id, 'Completed', 'Completed', day=day)
+        record_transition(self.workspace_id, 'Completed', 'In Progress', day=day)
+        record_transition(self.workspace_id, 'Pending', 'In Progress', day=day)
+        row = DailyTaskThroughput.objects.get(day=day)
+        self.assertEqual((row.created_count, row.completed_count, row.reopened_count), (1, 1, 1))
+
+    def test_task_saves_and_bulk_updates_feed_the_rollup(self):
+        task = create_task(self.user)
+        others = [create_task(self.user) for _ in range(2)]
+        task.status = 'Completed'
+        task.save()
+        task.status = 'Pending'
+        task.save()
+        self.assertEqual(self.today(), {'day': date.today().isoformat(), 'created': 3, 'completed': 1, 'reopened': 1})
+
+        bulk_update_tasks(Task.objects.filter(pk__in=[other.pk for other in others]), status='Completed')
+        bulk_update_tasks(Task.objects.all(), status='In Progress')
+        self.assertEqual((self.today()['completed'], self.today()['reopened']), (3, 3))
+
+    def test_latest_snapshot_respects_the_range_end(self):
+        create_task(self.user, category=Category.objects.create(name='Early'))
+        snapshot_open_tasks(day=date(2026, 1, 1))
+        Task.objects.update(category=Category.objects.create(name='Late'))
+        snapshot_open_tasks(day=date(2026, 2, 1))
+
+        self.assertEqual(latest_snapshot(date(2026, 1, 15))['day'], '2026-01-01')
+        self.assertIn('Early', latest_snapshot(date(2026, 1, 15))['overdue']['category'])
+        self.assertEqual(latest_snapshot()['day'], '2026-02-01')
+        self.assertIsNone(latest_snapshot(date(2025, 12, 31))['day'])
+
+        self.client.force_login(self.user)
+        payload = self.client.get(reverse('task_analytics'), {'start': '2026-01-01', 'end': '2026-01-20'}).json()
+        self.assertEqual(payload['day'], '2026-01-01')
+
+
+class TaskCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.task = create_task(cls.user)
+
+    def counters(self, model=Task):
+        return model.objects.filter(pk=self.task.pk).values_list('comment_count', 'attachment_count').get()
+
+    def test_comments_and_attachments_adjust_the_counters(self):
+        comment = Comment.objects.create(task=self.task, user=self.user, content='One')
+        Comment.objects.create(task=self.task, user=self.user, content='Two')
+        Attachment.objects.create(task=self.task, uploaded_by=self.user, file='task_attachments/a.pdf')
+        self.assertEqual(self.counters(), (2, 1))
+        self.assertEqual(self.counters(TaskSummary), (2, 1))
+        comment.delete()
+        self.assertEqual(self.counters(), (1, 1))
+        self.assertEqual(self.counters(TaskSummary), (1, 1))
+
+    def test_saving_a_stale_task_keeps_the_counters(self):
+        stale = Task.objects.get(pk=self.task.pk)
+        Comment.objects.create(task=self.task, user=self.user, content='New')
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertEqual(self.counters(), (1, 0))
+
+    def test_reconcile_repairs_drifted_counters(self):
+        Comment.objects.create(task=self.task, user=self.user, content='Real')
+        activity = Task.objects.get(pk=self.task.pk).last_activity_at
+        Task.objects.filter(pk=self.task.pk).update(comment_count=5, attachment_count=2)
+        TaskSummary.objects.filter(pk=self.task.pk).update(comment_count=5, attachment_count=2)
+        untouched = create_task(self.user)
+
+        self.assertEqual(reconcile_task_counters(dry_run=True), [self.task.pk])
+        self.assertEqual(self.counters(), (5, 2))
+        self.assertEqual(reconcile_task_counters(batch_size=1), [self.task.pk])
+        self.assertEqual(self.counters(), (1, 0))
+        self.assertEqual(self.counters(TaskSummary), (1, 0))
+        self.assertEqual(Task.objects.get(pk=self.task.pk).last_activity_at, activity)
+        self.assertEqual(reconcile_task_counters(), [])
+        self.assertEqual(Task.objects.get(pk=untouched.pk).comment_count, 0)
+
+
+class TaskEventTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.other = create_user('other')
+
+    def test_values_round_trip_through_their_codes(self):
+        values = [
+            (TaskEvent.STATUS, 'In Progress'), (TaskEvent.PRIORITY, 'High'),
+            (TaskEvent.DUE_DATE, date(2026, 3, 1)), (TaskEvent.ASSIGNEE_ADDED, self.user.pk),
+        ]
+        for field, value in values:
+            code = TaskEvent.encode(field, value)
+            self.assertIsInstance(code, int)
+            self.assertEqual(TaskEvent.decode(field, code), value)
+        self.assertIsNone(TaskEvent.encode(TaskEvent.STATUS, None))
+
+    def test_changes_are_written_on_commit(self):
+        token = current_actor.set(self.other.pk)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                task = create_task(self.user)
+                task.status = 'Completed'
+                task.priority = 'High'
+                task.save()
+                task.assigned_to.add(self.other)
+        finally:
+            current_actor.reset(token)
+
+        changes = [(event.get_field_display(), event.old, event.new) for event in task_history(task.pk)]
+        self.assertIn(('Status', 'Pending', 'Completed'), changes)
+        self.assertIn(('Priority', 'Medium', 'High'), changes)
+        assigned = [event for event in task_history(task.pk) if event.field == TaskEvent.ASSIGNEE_ADDED]
+        self.assertEqual({event.user_name for event in assigned}, {'user', 'other'})
+        self.assertEqual({event.actor_name for event in task_history(task.pk)}, {'other'})
+        self.assertTrue(all(event.task_id == task.pk for event in user_history(self.other.pk)))
+
+    def test_rolled_back_savepoints_drop_their_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = create_task(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    task.status = 'Completed'
+                    task.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            task.refresh_from_db()
+            task.priority = 'Low'
+            task.save()
+        # After the creation events, only the change that survived
+        changes = [(event.get_field_display(), event.old, event.new) for event in task_history(task.pk)]
+        self.assertEqual(changes[0], ('Priority', 'Medium', 'Low'))
+        self.assertNotIn(('Status', 'Pending', 'Completed'), changes)
+
+    def test_history_includes_archived_events_when_asked(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = create_task(self.user)
+            task.status = 'Completed'
+            task.save()
+        TaskEvent.objects.update(created_at=timezone.now() - timedelta(days=200))
+        with self.captureOnCommitCallbacks(execute=True):
+            task.status = 'Pending'
+            task.save()
+        moved = archive_events(older_than_days=180)
+        self.assertEqual(TaskEventArchive.objects.count(), moved)
+        self.assertEqual([event.new for event in task_history(task.pk) if event.field == TaskEvent.STATUS], ['Pending'])
+        statuses = [event.new for event in task_history(task.pk, include_archived=True) if event.field == TaskEvent.STATUS]
+        # Newest first, down to the creation event
+        self.assertEqual(statuses, ['Pending', 'Completed', 'Pending'])
+
+    def test_history_is_shown_on_task_and_profile_pages(self):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task_create'), {
+                'title': 'Tracked', 'due_date': date.today().isoformat(), 'priority': 'Low', 'status': 'Pending',
+                'assigned_to': [self.other.pk],
+            })
+        task = Task.objects.get(title='Tracked')
+        self.assertContains(self.client.get(reverse('task_detail', args=[task.pk])), 'Assignee added:</strong> other')
+        self.assertContains(self.client.get(reverse('profile')), f"#{task.pk}</a>")
+
+
+@override_settings(SHARED_CACHE=True, SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+class IdentityCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_users_carry_no_password_hash(self):
+        get_cached_user(self.user.pk)
+        with self.assertNumQueries(0):
+            user = get_cached_user(self.user.pk)
+        self.assertNotIn(self.user.password, repr(cache.get(f"identity:user:{self.user.pk}")))
+        self.assertEqual((user.username, user.get_session_auth_hash()), ('user', self.user.get_session_auth_hash()))
+        self.assertIn('password', user.get_deferred_fields())
+
+        user.first_name = 'Ann'
+        user.save()
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password('pw'))
+
+    def test_password_change_ends_cached_sessions(self):
+        self.client.login(username='user', password='pw')
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+        self.user.set_password('new')
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 302)
+
+    def test_cached_get_needs_at_most_one_query(self):
+        self.client.login(username='user', password='pw')
+        create_task(self.user, title='Listed')
+        url = reverse('task_list') + '?fragment=1'
+        self.assertContains(self.client.get(url), 'Listed')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertContains(self.client.get(url), 'Listed')
+        self.assertLessEqual(len(queries), 1, [query['sql'] for query in queries])
+
+    def test_reads_by_users_without_a_profile_never_write(self):
+        workspace = Workspace.objects.create(name='Other', slug='other')
+        with in_workspace(workspace):
+            create_task(create_user('owner', workspace), title='Elsewhere')
+        Profile.all_objects.filter(user=self.user).delete()
+        Workspace.objects.filter(slug=Workspace.DEFAULT_SLUG).delete()
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('task_list'))
+        self.assertNotContains(response, 'Elsewhere')
+        self.assertFalse([query['sql'] for query in queries if not query['sql'].startswith(('SELECT', 'SAVEPOINT', 'RELEASE'))])
+        self.assertFalse(Workspace.objects.filter(slug=Workspace.DEFAULT_SLUG).exists())
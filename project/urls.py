@@ -10,10 +10,24 @@ urlpatterns = [
     path('task/new/', views.task_create, name='task_create'),
     path('task/<int:task_id>/edit/', views.task_update, name='task_update'),
     path('task/<int:task_id>/delete/', views.task_delete, name='task_delete'),
-    path('task/<int:task_id>/', views.task_detail, name='task_detail'),    
+    path('task/<int:task_id>/', views.task_detail, name='task_detail'),
+    path('task/<int:task_id>/restore/', views.task_restore, name='task_restore'),    
+    path('task/<int:task_id>/dependencies/', views.task_dependency_add, name='task_dependency_add'),
+    path('task/<int:task_id>/dependencies/<int:blocker_id>/delete/', views.task_dependency_remove, name='task_dependency_remove'),
+
+    # Saved views
+    path('views/save/', views.saved_view_create, name='saved_view_create'),
+    path('views/<int:view_id>/', views.saved_view_detail, name='saved_view_detail'),
+    path('views/<int:view_id>/delete/', views.saved_view_delete, name='saved_view_delete'),
+
+    # Board
+    path('board/', views.board, name='board'),
+    path('board/column/<str:status>/', views.board_column, name='board_column'),
+    path('board/move/', views.board_move, name='board_move'),
 
     # Dashboard
     path('dashboard/', views.user_dashboard, name='user_dashboard'),
+    path('analytics/', views.task_analytics, name='task_analytics'),
 
     # Authentication
     path('accounts/login/', auth_views.LoginView.as_view(), name='login'),
@@ -29,6 +43,11 @@ urlpatterns = [
     # Profile
     path('profile/', views.profile_view, name='profile'),
     path('profile/update/', views.profile_update, name='profile_update'),
+    path('profile/calendar/reset/', views.calendar_token_reset, name='calendar_token_reset'),
+
+    # Calendar feeds
+    path('calendar/<str:token>.ics', views.calendar_feed, name='calendar_feed'),
+    path('calendar/<str:token>/category/<int:category_id>.ics', views.calendar_feed, name='category_calendar_feed'),
 ]
 
 if settings.DEBUG:
@@ -1,28 +1,32 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.contrib import messages
-from django.contrib.auth.models import User
-from django.db.models import Q
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, Http404
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_GET, require_POST
+from django.db.models import Count, Q
 from django.utils import timezone
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-
-from .models import Task, Category, Tag, Comment, Attachment, Profile
-from .forms import TaskForm, ProfileForm, CommentForm, AttachmentForm
+from datetime import date, timedelta
+
+from .models import Task, Category, Tag, TaskSummary, ArchivedTask, TaskDependency, SavedView
+from .forms import TaskForm, ProfileForm, CommentForm, AttachmentForm, DependencyForm
+from .analytics import throughput_series, latest_snapshot
+from .permissions import get_task_permissions
+from .fragments import normalize_filters, wants_fragment, render_fragment
+from .identity import get_profile
+from .archive import restore_task
+from .calendar_feeds import resolve_token, get_feed
+from .models import new_calendar_token
+from .board import column_page, move_task
+from .hierarchy import ancestors, completion, with_completion, blockers, blocked_tasks
+from .saved_views import summary_filter, save_view, with_unread_counts, open_view
+from .workspaces import workspace_users
+from .events import task_history, user_history
 from django.contrib.auth.forms import UserCreationForm
 
 
-# Signal to create/update profile when a user is created
-@receiver(post_save, sender=User)
-def manage_user_profile(sender, instance, created, **kwargs):
-    """Ensures a user profile is created and updated properly."""
-    if created:
-        Profile.objects.get_or_create(user=instance)
-    else:
-        instance.profile.save()
-
-
 # User Registration View
 def register(request):
     """Handles user registration."""
@@ -42,7 +46,7 @@ def register(request):
 @login_required
 def profile_update(request):
     """Handles profile update functionality."""
-    profile, created = Profile.objects.get_or_create(user=request.user)
+    profile = get_profile(request)
 
     if request.method == 'POST':
         form = ProfileForm(request.POST, request.FILES, instance=profile)
@@ -56,32 +60,68 @@ def profile_update(request):
     return render(request, 'project/profile_update.html', {'form': form})
 
 
+# Newest events shown on task and profile pages
+TASK_HISTORY_LIMIT = 20
+
+
 # Profile View
 @login_required
 def profile_view(request):
     """Displays the user's profile."""
-    profile, created = Profile.objects.get_or_create(user=request.user)
-    return render(request, 'project/profile.html', {'profile': profile})
+    profile = get_profile(request)
+    feed_url = request.build_absolute_uri(reverse('calendar_feed', args=[profile.calendar_token]))
+    return render(request, 'project/profile.html', {
+        'profile': profile,
+        'feed_url': feed_url,
+        'activity': user_history(request.user.pk, limit=TASK_HISTORY_LIMIT),
+    })
 
 
-# Task List View with Filtering
+# Calendar Feed Reset View
 @login_required
-def task_list(request):
-    """Displays the list of tasks with search and filter functionality."""
-    tasks = Task.objects.select_related('category').prefetch_related('tags', 'assigned_to')
+@require_POST
+def calendar_token_reset(request):
+    """Issues a new calendar feed token, revoking the old feed URLs."""
+    profile = get_profile(request)
+    profile.calendar_token = new_calendar_token()
+    profile.save()
+    messages.success(request, "Your calendar feed address was reset.")
+    return redirect('profile')
+
+
+# Calendar Feed View (token-authenticated, polled by calendar clients)
+@require_GET
+def calendar_feed(request, token, category_id=None):
+    """Serves the user's assigned tasks as iCalendar, answering conditional requests with 304."""
+    user = resolve_token(token)
+    if user is None:
+        raise Http404("Unknown calendar feed.")
+    feed = get_feed(user, category_id)
+    if feed is None:
+        raise Http404("Unknown category.")
+
+    last_modified = int(feed['last_modified'].timestamp())
+    if_none_match = request.headers.get('If-None-Match')
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    if (if_none_match and feed['etag'] in if_none_match) or (
+        not if_none_match and if_modified_since is not None and if_modified_since >= last_modified
+    ):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(feed['body'], content_type='text/calendar; charset=utf-8')
+    response.headers['ETag'] = feed['etag']
+    response.headers['Last-Modified'] = http_date(last_modified)
+    response.headers['Cache-Control'] = 'private, max-age=300'
+    return response
+
+
+# Task List View with Filtering
+TASK_LIST_FILTERS = ('status', 'priority', 'category', 'tag', 'due_date', 'assigned_to', 'search', 'archived')
 
-    # Filtering logic
-    filters = Q()
-    filter_params = {
-        'status': request.GET.get('status'),
-        'priority': request.GET.get('priority'),
-        'category': request.GET.get('category'),
-        'tag': request.GET.get('tag'),
-        'due_date': request.GET.get('due_date'),
-        'assigned_to': request.GET.get('assigned_to'),
-        'search': request.GET.get('search'),
-    }
 
+def _archived_results(filter_params):
+    """Searches the cold archive tables; only runs when the list is asked to include archived tasks."""
+    filters = Q()
     if filter_params['status']:
         filters &= Q(status=filter_params['status'])
     if filter_params['priority']:
@@ -97,17 +137,139 @@ def task_list(request):
     if filter_params['search']:
         filters &= Q(title__icontains=filter_params['search']) | Q(description__icontains=filter_params['search'])
 
-    tasks = tasks.filter(filters).distinct()
+    return (
+        ArchivedTask.objects.filter(filters).select_related('category').prefetch_related('assigned_to')
+        .distinct().order_by('-archived_at')
+    )
+
+
+def _task_list_results(request, filter_params):
+    """Builds the context of the result list for the given normalized filters."""
+    # Reads the flat summary table; tag/assignee filters go through the M2M rows so names match exactly
+    tasks = TaskSummary.objects.order_by('task_id')
+
+    tasks = list(tasks.filter(summary_filter(filter_params)))
+    task_perms = get_task_permissions(request).load([task.pk for task in tasks])
+    results = {'tasks': tasks, 'task_perms': task_perms}
+    if filter_params['archived']:
+        results['archived_tasks'] = _archived_results(filter_params)
+        results['can_restore'] = request.user.is_staff or get_profile(request).role == 'Manager'
+    return results
+
+
+@login_required
+def task_list(request):
+    """Displays the list of tasks with search and filter functionality."""
+    filter_params = normalize_filters(request.GET, TASK_LIST_FILTERS)
+
+    # Filter changes only need the result list, which is cached per filter combination
+    if wants_fragment(request):
+        return render_fragment(
+            request, 'task_list', 'project/partials/task_list_results.html', filter_params,
+            lambda: _task_list_results(request, filter_params),
+            # Archived results carry CSRF-protected restore forms
+            cacheable=not filter_params['archived'],
+        )
 
     return render(request, 'project/task_list.html', {
-        'tasks': tasks,
+        **_task_list_results(request, filter_params),
         'categories': Category.objects.all(),
         'tags': Tag.objects.all(),
-        'users': User.objects.all(),
+        'users': workspace_users(),
+        'saved_views': with_unread_counts(request.user.saved_views.order_by('name')),
         **filter_params
     })
 
 
+# Saved View Views
+@login_required
+@require_POST
+def saved_view_create(request):
+    """Saves the submitted task_list filters under a name."""
+    name = ' '.join(request.POST.get('name', '').split())
+    if not name:
+        messages.error(request, "Give the view a name.")
+        return redirect('task_list')
+    view = save_view(request.user, name[:100], normalize_filters(request.POST, TASK_LIST_FILTERS))
+    messages.success(request, f"Saved view \"{view.name}\".")
+    return redirect('saved_view_detail', view_id=view.pk)
+
+
+@login_required
+def saved_view_detail(request, view_id):
+    """Lists one page of a saved view's materialized tasks, flagging those changed since the last visit."""
+    view = get_object_or_404(with_unread_counts(SavedView.objects.filter(user=request.user)), pk=view_id)
+    page, tasks, changed_ids = open_view(view, request.GET.get('page'))
+    tasks = list(tasks)
+    return render(request, 'project/saved_view.html', {
+        'view': view,
+        'page_obj': page,
+        'tasks': tasks,
+        'changed_ids': changed_ids,
+        'task_perms': get_task_permissions(request).load([task.pk for task in tasks]),
+    })
+
+
+@login_required
+@require_POST
+def saved_view_delete(request, view_id):
+    """Deletes one of the user's saved views."""
+    get_object_or_404(SavedView, pk=view_id, user=request.user).delete()
+    messages.success(request, "Saved view deleted.")
+    return redirect('task_list')
+
+
+# Kanban Board Views
+@login_required
+def board(request):
+    """Displays the board shell; each status column loads its cards lazily."""
+    return render(request, 'project/board.html', {'columns': Task.STATUS_CHOICES})
+
+
+@login_required
+@require_GET
+def board_column(request, status):
+    """Returns one cursor-paginated page of cards for a board column."""
+    if status not in dict(Task.STATUS_CHOICES):
+        raise Http404("Unknown column.")
+    try:
+        tasks, next_cursor = column_page(status, request.GET.get('cursor'))
+    except ValueError:
+        return JsonResponse({'error': "Invalid cursor."}, status=400)
+    task_perms = get_task_permissions(request).load([task.pk for task in tasks])
+    return render(request, 'project/partials/board_cards.html', {
+        'tasks': tasks,
+        'task_perms': task_perms,
+        'status': status,
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required
+@require_POST
+def board_move(request):
+    """Moves a card to a column position given the ids of its new neighbours."""
+    try:
+        task_id = int(request.POST['task_id'])
+        before_id = int(request.POST['before_id']) if request.POST.get('before_id') else None
+        after_id = int(request.POST['after_id']) if request.POST.get('after_id') else None
+    except (KeyError, ValueError):
+        return JsonResponse({'error': "task_id, before_id and after_id must be task ids."}, status=400)
+    status = request.POST.get('status')
+    if status not in dict(Task.STATUS_CHOICES):
+        return JsonResponse({'error': "Unknown column."}, status=400)
+
+    task = get_object_or_404(Task, id=task_id)
+    if not get_task_permissions(request).can_edit(task.pk):
+        return JsonResponse({'error': "You do not have permission to move this task."}, status=403)
+    try:
+        rank = move_task(task, status, before_id, after_id)
+    except ValueError as error:
+        # The client's view of the column is stale; it should reload the column
+        return JsonResponse({'error': str(error)}, status=409)
+    return JsonResponse({'task_id': task.pk, 'status': status, 'rank': rank})
+
+
 # Task Create View
 @login_required
 def task_create(request):
@@ -115,12 +277,13 @@ def task_create(request):
     if request.method == "POST":
         form = TaskForm(request.POST)
         if form.is_valid():
+            form.instance.created_by = request.user
             task = form.save()
             task.assigned_to.set(form.cleaned_data['assigned_to'])  # Assign users
             messages.success(request, "Task created successfully!")
             return redirect('task_list')
     else:
-        form = TaskForm()
+        form = TaskForm(initial={'parent': request.GET.get('parent')})
     return render(request, 'project/task_form.html', {'form': form})
 
 
@@ -129,7 +292,11 @@ def task_create(request):
 def task_update(request, task_id):
     """Handles task updates."""
     task = get_object_or_404(Task, id=task_id)
-    
+
+    if not get_task_permissions(request).can_edit(task.pk):
+        messages.error(request, "You do not have permission to edit this task.")
+        return redirect('task_list')
+
     if request.method == "POST":
         form = TaskForm(request.POST, instance=task)
         if form.is_valid():
@@ -149,7 +316,7 @@ def task_delete(request, task_id):
     """Handles task deletion."""
     task = get_object_or_404(Task, id=task_id)
 
-    if request.user == task.created_by or request.user.is_staff:
+    if get_task_permissions(request).can_delete(task.pk):
         if request.method == "POST":
             task.delete()
             messages.success(request, "Task deleted successfully.")
@@ -161,6 +328,22 @@ def task_delete(request, task_id):
     return render(request, 'project/task_confirm_delete.html', {'task': task})
 
 
+# Archived Task Restore View
+@login_required
+def task_restore(request, task_id):
+    """Moves an archived task back into the working set (Managers only)."""
+    if request.method != "POST":
+        return redirect('task_list')
+    if not request.user.is_staff and get_profile(request).role != 'Manager':
+        messages.error(request, "You do not have permission to restore archived tasks.")
+        return redirect('task_list')
+
+    get_object_or_404(ArchivedTask, pk=task_id)
+    restore_task(task_id)
+    messages.success(request, "Task restored from the archive.")
+    return redirect('task_detail', task_id=task_id)
+
+
 # Task Detail View
 @login_required
 def task_detail(request, task_id):
@@ -193,18 +376,63 @@ def task_detail(request, task_id):
         'attachments': task.attachments.all(),
         'comment_form': comment_form,
         'attachment_form': attachment_form,
+        'ancestors': ancestors(task),
+        'subtasks': with_completion(task.subtasks.order_by('pk')),
+        'completion': completion(task),
+        'dependencies': task.dependencies.select_related('blocked_by'),
+        'blockers': list(blockers(task)),
+        'blocked_tasks': list(blocked_tasks(task)),
+        'dependency_form': DependencyForm(),
+        'history': task_history(task.pk, limit=TASK_HISTORY_LIMIT),
     })
 
 
+# Task Dependency Views
+@login_required
+def task_dependency_add(request, task_id):
+    """Marks a task as blocked by another one, rejecting dependency cycles."""
+    task = get_object_or_404(Task, id=task_id)
+    if request.method != "POST":
+        return redirect('task_detail', task_id=task.id)
+    if not get_task_permissions(request).can_edit(task.pk):
+        messages.error(request, "You do not have permission to edit this task.")
+        return redirect('task_detail', task_id=task.id)
+
+    form = DependencyForm(request.POST, instance=TaskDependency(task=task))
+    if form.is_valid():
+        TaskDependency.objects.get_or_create(task=task, blocked_by=form.cleaned_data['blocked_by'])
+        messages.success(request, "Dependency added.")
+    else:
+        for error in form.errors.values():
+            messages.error(request, error[0])
+    return redirect('task_detail', task_id=task.id)
+
+
+@login_required
+def task_dependency_remove(request, task_id, blocker_id):
+    """Removes one "blocked by" link from a task."""
+    task = get_object_or_404(Task, id=task_id)
+    if request.method == "POST" and get_task_permissions(request).can_edit(task.pk):
+        TaskDependency.objects.filter(task=task, blocked_by_id=blocker_id).delete()
+        messages.success(request, "Dependency removed.")
+    return redirect('task_detail', task_id=task.id)
+
+
 # User Dashboard View
 @login_required
 def user_dashboard(request):
     """Displays the dashboard with tasks assigned to the logged-in user."""
-    tasks = Task.objects.filter(assigned_to=request.user)
-    total_tasks = tasks.count()
-    completed_tasks = tasks.filter(status="Completed").count()
-    overdue_tasks = tasks.filter(due_date__lt=timezone.now()).exclude(status='Completed').count()
-    pending_tasks = tasks.filter(status="Pending").count()
+    tasks = TaskSummary.objects.filter(TaskSummary.assigned_filter(pk=request.user.pk)).order_by('task_id')
+    counts = tasks.aggregate(
+        total=Count('pk'),
+        completed=Count('pk', filter=Q(status='Completed')),
+        overdue=Count('pk', filter=Q(due_date__lt=timezone.localdate()) & ~Q(status='Completed')),
+        pending=Count('pk', filter=Q(status='Pending')),
+    )
+    total_tasks = counts['total']
+    completed_tasks = counts['completed']
+    overdue_tasks = counts['overdue']
+    pending_tasks = counts['pending']
 
     return render(request, 'project/user_dashboard.html', {
         "tasks": tasks,
@@ -213,3 +441,27 @@ def user_dashboard(request):
         "overdue_tasks": overdue_tasks,
         "pending_tasks": pending_tasks,
     })
+
+
+# Task Analytics View (Managers only)
+@login_required
+def task_analytics(request):
+    """Returns throughput, aging and overdue rollups as JSON for the given date range."""
+    if not request.user.is_staff and get_profile(request).role != 'Manager':
+        return JsonResponse({'error': "Only managers can view analytics."}, status=403)
+
+    today = timezone.localdate()
+    try:
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else today
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else end - timedelta(days=29)
+    except ValueError:
+        return JsonResponse({'error': "Dates must be in YYYY-MM-DD format."}, status=400)
+    if start > end or (end - start).days > 366:
+        return JsonResponse({'error': "The range must be at most one year, with start before end."}, status=400)
+
+    return JsonResponse({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'throughput': throughput_series(start, end),
+        **latest_snapshot(end),
+    })
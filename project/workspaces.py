@@ -0,0 +1,36 @@
+from contextvars import ContextVar
+
+from django.contrib.auth.models import User
+from django.db import models
+
+# Set per request by WorkspaceMiddleware; None (management commands, anonymous requests) means unscoped
+current_workspace = ContextVar('current_workspace', default=None)
+# Scope matching no rows, for signed-in users whose workspace does not exist
+NO_WORKSPACE = -1
+
+
+class WorkspaceManager(models.Manager):
+    """Default manager of partitioned models: only rows of the current workspace, when one is active.
+
+    Cross-workspace code (summaries, archival, identity) uses the plain `all_objects` manager instead.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        workspace_id = current_workspace.get()
+        if workspace_id is not None:
+            queryset = queryset.filter(workspace_id=workspace_id)
+        return queryset
+
+
+def workspace_users():
+    """Users whose profile is in the current workspace (every user when unscoped)."""
+    workspace_id = current_workspace.get()
+    if workspace_id is None:
+        return User.objects.all()
+    return User.objects.filter(profile__workspace_id=workspace_id)
+
+
+def workspace_key(key):
+    """Prefixes a cache key with the current workspace so partitions never share cached data."""
+    return f"w{current_workspace.get() or 'all'}:{key}"